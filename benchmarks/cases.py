@@ -0,0 +1,240 @@
+'''Benchmark cases for the theme hot paths.
+
+Each case is a function returning (op, created), where op runs the
+operation once and created returns a running count of DPG items created.
+The controller runs on a RecordingBackend; the Theminator cases also need
+a dearpygui context for their widgets, but never a viewport.
+'''
+from collections.abc import Callable
+import dataclasses
+import importlib.resources
+import itertools
+import pathlib
+
+import msgspec
+
+import dpgtheminator
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.bundle import default_bundle
+from dpgtheminator.controller import Controller
+from dpgtheminator.models import Color
+from dpgtheminator.models import CoreColors
+from dpgtheminator.models import Palette
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+from dpgtheminator.pool import ThemePool
+
+
+Op = Callable[[], object]
+Setup = Callable[[], tuple[Op, Callable[[], int]]]
+
+
+@dataclasses.dataclass
+class Case:
+    name: str
+    setup: Setup
+    needs_dpg: bool = False
+
+
+CASES: list[Case] = []
+
+
+def case(name: str, needs_dpg: bool = False):
+    def _register(setup: Setup) -> Setup:
+        CASES.append(Case(name, setup, needs_dpg))
+        return setup
+    return _register
+
+
+def default_theme_names() -> list[str]:
+    themes = importlib.resources.files(dpgtheminator) / 'default_themes'
+    return sorted(path.name.removesuffix('.json') for path in themes.iterdir() if path.name.endswith('.json'))
+
+
+def default_theme_path(name: str) -> pathlib.Path:
+    return pathlib.Path(str(importlib.resources.files(dpgtheminator) / f'default_themes/{name}.json'))
+
+
+def default_palette(name: str) -> Palette:
+    content = (importlib.resources.files(dpgtheminator) / f'default_palettes/{name}.json').read_bytes()
+    return msgspec.json.decode(content, type=Palette)
+
+
+def fresh_load(backend: RecordingBackend, theme: str | pathlib.Path | Theme):
+    # A new controller every time, so each load is a full build; releasing
+    # afterwards keeps items from piling up across iterations
+    controller = Controller(backend=backend)
+    if isinstance(theme, Theme):
+        controller.load(theme, 'bench')
+    else:
+        controller.load(theme)
+    controller.release()
+
+
+def _decode_case(name: str):
+    def setup():
+        content = default_theme_path(name).read_bytes()
+        return (lambda: msgspec.json.decode(content, type=Theme)), (lambda: 0)
+    return setup
+
+
+def _bundle_decode_case(name: str):
+    def setup():
+        defaults = default_bundle()
+        assert defaults is not None, 'run scripts/generate_bundle.py'
+        return (lambda: defaults.theme(name)), (lambda: 0)
+    return setup
+
+
+for _name in default_theme_names():
+    case(f'decode[{_name}]')(_decode_case(_name))
+    case(f'bundle.theme[{_name}]')(_bundle_decode_case(_name))
+
+
+@case('load[str]')
+def load_str():
+    backend = RecordingBackend()
+    return (lambda: fresh_load(backend, 'catppuccin_mocha')), (lambda: backend.created_count)
+
+
+@case('load[Path]')
+def load_path():
+    backend = RecordingBackend()
+    path = default_theme_path('catppuccin_mocha')
+    return (lambda: fresh_load(backend, path)), (lambda: backend.created_count)
+
+
+@case('load[Theme]')
+def load_theme():
+    backend = RecordingBackend()
+    theme = msgspec.json.decode(default_theme_path('catppuccin_mocha').read_bytes(), type=Theme)
+    return (lambda: fresh_load(backend, theme)), (lambda: backend.created_count)
+
+
+@case('reload().bind()')
+def reload_bind():
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('catppuccin_mocha')
+    return (lambda: controller.reload().bind()), (lambda: backend.created_count)
+
+
+@case('rebind_colormaps[1000]')
+def rebind_colormaps():
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('catppuccin_mocha')
+    for target in range(1000):
+        controller.bind_colormap(0, f'plot_{target}')
+    return controller.rebind_colormaps, (lambda: backend.created_count)
+
+
+@case('switch_theme.rebind_colormaps[500]')
+def switch_theme_rebind_colormaps():
+    # Mocha and latte have different colormaps, so every switch moves all
+    # the plots; once both are cached nothing new is built
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('catppuccin_mocha')
+    for target in range(500):
+        controller.bind_colormap(0, f'plot_{target}')
+    names = itertools.cycle(['catppuccin_latte', 'catppuccin_mocha'])
+    return (lambda: controller.load(next(names)).rebind_colormaps()), (lambda: backend.created_count)
+
+
+@case('ThemePool.bind_many[10000]')
+def pool_bind_many():
+    backend = RecordingBackend()
+    pool = ThemePool(backend=backend)
+    rows = list(range(10000))
+    statuses = [
+        ThemeComponent(core_colors=CoreColors(button=Color(red, green, 0.2)))
+        for red, green in ((0.8, 0.2), (0.2, 0.8), (0.8, 0.8))
+    ]
+    flip = itertools.cycle(range(len(statuses)))
+
+    def op():
+        # Move every row to the next status, as a table refresh would
+        offset = next(flip)
+        for index, status in enumerate(statuses):
+            pool.bind_many(rows[index::len(statuses)], statuses[(index + offset) % len(statuses)])
+    return op, (lambda: backend.created_count)
+
+
+_uuid_calls = itertools.count()
+
+
+def _dpg_created() -> int:
+    import dearpygui.dearpygui as dpg  # type: ignore
+    # Item ids come from one counter, so the next id tracks items created,
+    # less the ids this function has used up itself
+    return dpg.generate_uuid() - next(_uuid_calls)
+
+
+@case('Theminator()', needs_dpg=True)
+def theminator():
+    from dpgtheminator.gui.theminator import Theminator
+
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('catppuccin_mocha')
+
+    def op():
+        Theminator(controller).render().delete()
+    return op, (lambda: backend.created_count + _dpg_created())
+
+
+@case('Theminator()[20 components]', needs_dpg=True)
+def theminator_components():
+    from dpgtheminator.gui.theminator import Theminator
+
+    # mocha's colors on every item type up to 20, as a per-widget theme
+    # would have; only the first component's rows are built up front
+    backend = RecordingBackend()
+    mocha = Controller(backend=backend).load('catppuccin_mocha').theme
+    assert mocha is not None
+    component = mocha.components[0]
+    theme = Theme([
+        ThemeComponent(component=item_type, core_colors=component.core_colors, plot_colors=component.plot_colors)
+        for item_type in range(20)
+    ])
+    controller = Controller(backend=backend).load(theme, 'components')
+
+    def op():
+        Theminator(controller).render().delete()
+    return op, (lambda: backend.created_count + _dpg_created())
+
+
+@case('Theminator.on_theme_load', needs_dpg=True)
+def theminator_on_theme_load():
+    from dpgtheminator.gui.theminator import Theminator
+
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('catppuccin_mocha')
+    gui = Theminator(controller).render()
+    names = itertools.cycle(['catppuccin_frappe', 'catppuccin_mocha'])
+
+    def op():
+        controller.load(next(names))
+        gui.on_theme_load()
+    return op, (lambda: backend.created_count + _dpg_created())
+
+
+@case('Theminator.set_filter', needs_dpg=True)
+def theminator_set_filter():
+    from dpgtheminator.gui.theminator import Theminator
+
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('catppuccin_mocha')
+    gui = Theminator(controller).render()
+    # Typing a slot name one key at a time, then clearing it
+    query = 'scrollbar_grab_hovered'
+    queries = itertools.cycle([query[:end] for end in range(len(query) + 1)])
+    return (lambda: gui.set_filter(None, next(queries))), (lambda: backend.created_count + _dpg_created())
+
+
+@case('set_palette', needs_dpg=True)
+def set_palette():
+    from dpgtheminator.gui.theminator import Theminator
+
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('catppuccin_mocha')
+    gui = Theminator(controller).render()
+    palettes = itertools.cycle([default_palette('catppuccin_frappe'), default_palette('catppuccin_mocha')])
+    return (lambda: gui.set_palette(next(palettes))), (lambda: backend.created_count + _dpg_created())
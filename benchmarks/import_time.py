@@ -0,0 +1,85 @@
+'''Check import times of the public modules against a budget.
+
+Each module is imported in a fresh interpreter with -X importtime, and the
+best cumulative time over --runs runs is compared with its budget. The run
+also fails if a module drags in one of its forbidden imports, e.g. the
+models importing dearpygui.
+
+    python benchmarks/import_time.py
+'''
+import dataclasses
+import os
+import pathlib
+import subprocess
+import sys
+
+import cyclopts
+
+
+SRC_PATH = pathlib.Path(__file__).parent.parent / 'src'
+
+
+@dataclasses.dataclass
+class Budget:
+    module: str
+    milliseconds: float
+    forbidden: tuple[str, ...] = ()
+
+
+# Measured at 2-8ms, 25-35ms and 60-80ms respectively on a dev machine; most
+# of the models budget is msgspec itself, most of the controller's is stdlib
+# (dataclasses, importlib.resources)
+BUDGETS = (
+    Budget('dpgtheminator', 10, ('dearpygui', 'dpgcontainers', 'msgspec')),
+    Budget('dpgtheminator.models', 60, ('dearpygui', 'dpgcontainers')),
+    Budget('dpgtheminator.controller', 150, ('dearpygui', 'dpgcontainers')),
+)
+
+
+def import_time(module: str) -> tuple[float, set[str]]:
+    '''Cumulative import time of module in milliseconds, and the top level packages it imported'''
+    code = f'import sys; import {module}; print(" ".join(sorted(sys.modules)))'
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [str(SRC_PATH), os.environ.get('PYTHONPATH')]))}
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    cumulative = 0.0
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _, _, fields = line.partition('import time:')
+        parts = [part.strip() for part in fields.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative = int(parts[1]) / 1000
+    packages = {name.partition('.')[0] for name in completed.stdout.split()}
+    return cumulative, packages
+
+
+def main(*, runs: int = 5):
+    failures = []
+    print(f'{"module":28} {"best":>9} {"budget":>9}')
+    for budget in BUDGETS:
+        timings = []
+        packages: set[str] = set()
+        for _ in range(runs):
+            milliseconds, packages = import_time(budget.module)
+            timings.append(milliseconds)
+        best = min(timings)
+        print(f'{budget.module:28} {best:7.1f}ms {budget.milliseconds:7.1f}ms')
+        if best > budget.milliseconds:
+            failures.append(f'{budget.module} took {best:.1f}ms, budget is {budget.milliseconds:.1f}ms')
+        for forbidden in budget.forbidden:
+            if forbidden in packages:
+                failures.append(f'{budget.module} imports {forbidden}')
+
+    for failure in failures:
+        print(f'OVER BUDGET {failure}')
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    cyclopts.run(main)
@@ -0,0 +1,156 @@
+'''Run the theme benchmarks and compare them against saved baselines.
+
+    python benchmarks/run.py              # compare against baselines.json
+    python benchmarks/run.py --save       # record new baselines
+    python benchmarks/run.py --match load # only cases containing "load"
+
+Exits non-zero when a case regresses: retaining more allocated blocks
+than --alloc-tolerance allows, or creating more DPG items at all. Those
+counts don't depend on the machine. Baseline times were recorded on a
+single machine, so a case slower than its baseline by more than
+--time-tolerance is only reported, unless --fail-on-time is given.
+'''
+import dataclasses
+import gc
+import pathlib
+import time
+import tracemalloc
+
+import cyclopts
+import msgspec
+
+from cases import CASES
+from cases import Case
+
+
+BASELINES_PATH = pathlib.Path(__file__).parent / 'baselines.json'
+
+
+class Result(msgspec.Struct):
+    seconds: float
+    alloc_blocks: int
+    alloc_peak_kib: float
+    items_created: int
+
+
+def measure(case: Case, repeat: int, min_time: float) -> Result:
+    op, created = case.setup()
+    op()  # warm up caches and lazy imports
+
+    # Pick a loop count that makes each repeat take about min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 2
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                op()
+            timings.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    items_before = created()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    op()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    items_after = created()
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'lineno') if stat.count_diff > 0)
+    return Result(
+        seconds=min(timings),
+        alloc_blocks=blocks,
+        alloc_peak_kib=peak / 1024,
+        items_created=items_after - items_before,
+    )
+
+
+@dataclasses.dataclass
+class Regression:
+    case: str
+    reason: str
+    timing: bool = False
+
+
+def compare(
+    name: str,
+    result: Result,
+    baseline: Result,
+    time_tolerance: float,
+    alloc_tolerance: float,
+) -> list[Regression]:
+    regressions = []
+    if result.seconds > baseline.seconds * (1 + time_tolerance):
+        regressions.append(Regression(name, f'time {result.seconds * 1e6:.1f}us > baseline {baseline.seconds * 1e6:.1f}us', timing=True))
+    if result.alloc_blocks > baseline.alloc_blocks * (1 + alloc_tolerance) + 8:
+        regressions.append(Regression(name, f'alloc blocks {result.alloc_blocks} > baseline {baseline.alloc_blocks}'))
+    if result.items_created > baseline.items_created:
+        regressions.append(Regression(name, f'items created {result.items_created} > baseline {baseline.items_created}'))
+    return regressions
+
+
+def main(
+    *,
+    match: str = '',
+    save: bool = False,
+    repeat: int = 5,
+    min_time: float = 0.05,
+    time_tolerance: float = 0.5,
+    alloc_tolerance: float = 0.25,
+    fail_on_time: bool = False,
+    baselines: pathlib.Path = BASELINES_PATH,
+):
+    cases = [case for case in CASES if match in case.name]
+    if any(case.needs_dpg for case in cases):
+        import dearpygui.dearpygui as dpg  # type: ignore
+        dpg.create_context()
+
+    saved: dict[str, Result] = {}
+    if baselines.exists():
+        saved = msgspec.json.decode(baselines.read_bytes(), type=dict[str, Result])
+
+    results: dict[str, Result] = {}
+    regressions: list[Regression] = []
+    print(f'{"case":32} {"time":>12} {"vs base":>8} {"blocks":>8} {"peak KiB":>9} {"items":>6}')
+    for case in cases:
+        result = measure(case, repeat, min_time)
+        results[case.name] = result
+        baseline = saved.get(case.name)
+        ratio = '' if baseline is None else f'{result.seconds / baseline.seconds:.2f}x'
+        print(
+            f'{case.name:32} {result.seconds * 1e6:10.1f}us {ratio:>8} '
+            f'{result.alloc_blocks:8} {result.alloc_peak_kib:9.1f} {result.items_created:6}'
+        )
+        if baseline is not None and not save:
+            regressions.extend(compare(case.name, result, baseline, time_tolerance, alloc_tolerance))
+
+    if save:
+        saved.update(results)
+        baselines.write_bytes(msgspec.json.format(msgspec.json.encode(dict(sorted(saved.items())))) + b'\n')
+        print(f'Saved {len(results)} baselines to {baselines}')
+        return
+
+    failures = [regression for regression in regressions if fail_on_time or not regression.timing]
+    for regression in regressions:
+        label = 'REGRESSION' if regression in failures else 'SLOWER'
+        print(f'{label} {regression.case}: {regression.reason}')
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    cyclopts.run(main)
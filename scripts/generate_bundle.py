@@ -0,0 +1,30 @@
+import pathlib
+
+import cyclopts
+import msgspec
+
+from dpgtheminator import bundle
+from dpgtheminator.models import Palette
+from dpgtheminator.models import Theme
+
+
+PACKAGE_PATH = pathlib.Path(__file__).parent.parent / 'src/dpgtheminator'
+
+
+def _decode_all[T](directory: pathlib.Path, type_: type[T]) -> dict[str, T]:
+    return {
+        path.name.removesuffix('.json'): msgspec.json.decode(path.read_bytes(), type=type_)
+        for path in sorted(directory.glob('*.json'))
+    }
+
+
+def main(output: pathlib.Path = PACKAGE_PATH / bundle.BUNDLE_RESOURCE):
+    themes = _decode_all(PACKAGE_PATH / 'default_themes', Theme)
+    palettes = _decode_all(PACKAGE_PATH / 'default_palettes', Palette)
+    encoded = bundle.encode(themes, palettes)
+    output.write_bytes(encoded)
+    print(f'{len(themes)} themes, {len(palettes)} palettes, {len(encoded)} bytes -> {output}')
+
+
+if __name__ == '__main__':
+    cyclopts.run(main)
@@ -1,7 +1,21 @@
-from dpgtheminator.controller import Controller
+TYPE_CHECKING = False
 
+# The controller, and through it dearpygui and the GUI, are imported on first
+# use so that the models can be used without importing dearpygui at all
+if TYPE_CHECKING:
+    from dpgtheminator.controller import Controller
+
+
+def load(theme: str) -> 'Controller':
+    from dpgtheminator.controller import Controller
 
-def load(theme: str):
     controller = Controller()
     controller.load(theme)
     return controller
+
+
+def __getattr__(name: str):
+    if name == 'Controller':
+        from dpgtheminator.controller import Controller
+        return Controller
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
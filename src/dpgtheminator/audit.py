@@ -0,0 +1,218 @@
+'''WCAG contrast audit for themes, requires numpy.
+
+Contrast ratios for every (foreground, background) slot pair of every
+component of every theme are computed in one vectorized pass:
+
+    failures = audit.audit(themes)
+
+or from the command line, over theme files and directories of them:
+
+    python -m dpgtheminator.audit path/to/themes/ --defaults --minimum 4.5
+
+Translucent colors are composited before measuring: the foreground over the
+background, and the background over the backdrop slot (window_bg by
+default), which is treated as opaque.
+'''
+import argparse
+from collections.abc import Iterable
+from collections.abc import Sequence
+import importlib.resources
+import pathlib
+import typing
+
+import msgspec
+import numpy as np
+
+import dpgtheminator
+from dpgtheminator import colorspace
+from dpgtheminator.models import COLOR_GROUPS
+from dpgtheminator.models import Theme
+from dpgtheminator.packed import PackedTheme
+from dpgtheminator.packed import SLOT_INDEX
+
+
+WCAG_AA = 4.5
+WCAG_AA_LARGE = 3.0
+
+
+class ContrastPair(typing.NamedTuple):
+    '''Slots as "group.field", e.g. "core_colors.text"'''
+    foreground: str
+    background: str
+    minimum: float = WCAG_AA
+
+
+DEFAULT_PAIRS: tuple[ContrastPair, ...] = (
+    ContrastPair('core_colors.text', 'core_colors.window_bg'),
+    ContrastPair('core_colors.text', 'core_colors.child_bg'),
+    ContrastPair('core_colors.text', 'core_colors.popup_bg'),
+    ContrastPair('core_colors.text', 'core_colors.frame_bg'),
+    ContrastPair('core_colors.text', 'core_colors.button'),
+    ContrastPair('core_colors.text', 'core_colors.header'),
+    ContrastPair('core_colors.text', 'core_colors.title_bg_active'),
+    ContrastPair('core_colors.text', 'core_colors.menu_bar_bg'),
+    ContrastPair('core_colors.text', 'core_colors.table_header_bg'),
+    ContrastPair('plot_colors.axis_text', 'plot_colors.plot_bg'),
+    ContrastPair('plot_colors.title_text', 'plot_colors.frame_bg'),
+    ContrastPair('plot_colors.legend_text', 'plot_colors.legend_bg'),
+    ContrastPair('plot_colors.inlay_text', 'plot_colors.plot_bg'),
+    # Node titles are drawn in the core text color
+    ContrastPair('core_colors.text', 'node_colors.title_bar', WCAG_AA_LARGE),
+    ContrastPair('core_colors.text', 'node_colors.node_background'),
+)
+
+
+class AuditFailure(msgspec.Struct):
+    theme: str
+    component: int
+    foreground: str
+    background: str
+    ratio: float
+    minimum: float
+
+
+def _slot(name: str) -> tuple[str, int]:
+    group, _, field = name.partition('.')
+    if group not in COLOR_GROUPS or field not in COLOR_GROUPS[group].dpg_slot_indexes:
+        raise ValueError(f'Unknown color slot {name!r}, expected e.g. "core_colors.text"')
+    return group, COLOR_GROUPS[group].dpg_slot_indexes[field]
+
+
+def relative_luminance(srgb: np.ndarray) -> np.ndarray:
+    '''WCAG relative luminance of (..., 3) sRGB colors'''
+    return colorspace.srgb_to_linear(srgb) @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def _over(top: np.ndarray, bottom: np.ndarray) -> np.ndarray:
+    alpha = top[..., 3:]
+    return top[..., :3] * alpha + bottom[..., :3] * (1 - alpha)
+
+
+def contrast_ratios(
+    themes: Sequence[Theme],
+    pairs: Sequence[ContrastPair] = DEFAULT_PAIRS,
+    backdrop: str = 'core_colors.window_bg',
+) -> tuple[np.ndarray, np.ndarray]:
+    '''Contrast ratio of every pair in every component of themes.
+
+    Returns (ratios, owners): ratios is (components, pairs), NaN where
+    either slot is unset; owners is (components,) giving the index in
+    themes each row came from.
+    '''
+    packed = [PackedTheme.from_theme(theme) for theme in themes]
+    owners = np.repeat(np.arange(len(packed)), [len(theme.components) for theme in packed])
+    if not len(owners):
+        return np.empty((0, len(pairs))), owners
+    stacked = {group: np.concatenate([theme.colors[group] for theme in packed]) for group in SLOT_INDEX}
+
+    def gather(names: Iterable[str]) -> np.ndarray:
+        # (components, len(names), 4)
+        return np.stack([stacked[group][:, index] for group, index in map(_slot, names)], axis=1)
+
+    foregrounds = gather(pair.foreground for pair in pairs)
+    backgrounds = gather(pair.background for pair in pairs)
+    backdrop_colors = gather([backdrop])
+    # A missing backdrop counts as opaque black
+    backdrop_colors = np.where(np.isnan(backdrop_colors), [0.0, 0.0, 0.0, 1.0], backdrop_colors)
+
+    backgrounds = np.concatenate([_over(backgrounds, backdrop_colors), np.ones_like(backgrounds[..., :1])], axis=-1)
+    foregrounds = _over(foregrounds, backgrounds)
+
+    foreground_luminance = relative_luminance(foregrounds)
+    background_luminance = relative_luminance(backgrounds[..., :3])
+    lighter = np.maximum(foreground_luminance, background_luminance)
+    darker = np.minimum(foreground_luminance, background_luminance)
+    return (lighter + 0.05) / (darker + 0.05), owners
+
+
+def audit(
+    themes: Theme | Sequence[Theme],
+    pairs: Sequence[ContrastPair] = DEFAULT_PAIRS,
+    names: Sequence[str] | None = None,
+    minimum: float | None = None,
+    backdrop: str = 'core_colors.window_bg',
+) -> list[AuditFailure]:
+    '''Every pair below its minimum contrast, or below minimum if given'''
+    if isinstance(themes, Theme):
+        themes = [themes]
+    if names is None:
+        names = [str(index) for index in range(len(themes))]
+
+    ratios, owners = contrast_ratios(themes, pairs, backdrop)
+    minimums = np.array([pair.minimum if minimum is None else minimum for pair in pairs])
+    # Component index within its own theme
+    starts = np.concatenate([[0], np.cumsum([len(theme.components) for theme in themes])[:-1]]).astype(int)
+    components = np.arange(len(owners)) - starts[owners] if len(owners) else owners
+
+    failures = []
+    for row, column in zip(*np.nonzero(ratios < minimums)):
+        pair = pairs[column]
+        failures.append(AuditFailure(
+            theme=names[owners[row]],
+            component=int(components[row]),
+            foreground=pair.foreground,
+            background=pair.background,
+            ratio=round(float(ratios[row, column]), 2),
+            minimum=float(minimums[column]),
+        ))
+    return failures
+
+
+def _parse_pair(value: str) -> ContrastPair:
+    parts = value.split(':')
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(f'Expected foreground:background[:minimum], got {value!r}')
+    try:
+        for part in parts[:2]:
+            _slot(part)
+        return ContrastPair(parts[0], parts[1], *(float(part) for part in parts[2:]))
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
+def _theme_files(paths: Iterable[pathlib.Path]) -> list[pathlib.Path]:
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(path.glob('*.json')))
+        else:
+            files.append(path)
+    return files
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m dpgtheminator.audit', description='WCAG contrast audit for theme files')
+    parser.add_argument('paths', nargs='*', type=pathlib.Path, help='theme JSON files, or directories of them')
+    parser.add_argument('--defaults', action='store_true', help='also audit the bundled default themes')
+    parser.add_argument('--pair', action='append', type=_parse_pair, dest='pairs', metavar='FG:BG[:MIN]', help='slot pair to check instead of the defaults, e.g. core_colors.text:core_colors.window_bg:4.5')
+    parser.add_argument('--minimum', type=float, help='minimum ratio for every pair, overriding per pair minimums')
+    parser.add_argument('--backdrop', default='core_colors.window_bg', help='slot translucent backgrounds are composited over')
+    args = parser.parse_args(argv)
+
+    names: list[str] = []
+    contents: list[bytes] = []
+    for path in _theme_files(args.paths):
+        names.append(str(path))
+        contents.append(path.read_bytes())
+    if args.defaults:
+        for resource in sorted((importlib.resources.files(dpgtheminator) / 'default_themes').iterdir(), key=lambda resource: resource.name):
+            if resource.name.endswith('.json'):
+                names.append(resource.name.removesuffix('.json'))
+                contents.append(resource.read_bytes())
+    if not names:
+        parser.error('no themes to audit')
+
+    decoder = msgspec.json.Decoder(Theme)
+    themes = [decoder.decode(content) for content in contents]
+    failures = audit(themes, args.pairs or DEFAULT_PAIRS, names, args.minimum, args.backdrop)
+    for failure in failures:
+        print(
+            f'{failure.theme} [{failure.component}] {failure.foreground} on {failure.background}: '
+            f'{failure.ratio:.2f} < {failure.minimum:.2f}'
+        )
+    print(f'{len(themes)} themes, {len(failures)} failures')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
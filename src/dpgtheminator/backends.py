@@ -0,0 +1,330 @@
+'''Backends the controller builds and binds DPG items through.
+
+DearPyGuiBackend talks to dearpygui. RecordingBackend keeps an in-memory
+item tree and a log of calls instead, so load, reload, bind and edit flows
+can run (and be timed) without a dearpygui context or display.
+'''
+import abc
+from collections.abc import Callable
+from collections.abc import Iterable
+import collections
+import dataclasses
+import threading
+import typing
+
+if typing.TYPE_CHECKING:
+    from dpgtheminator.colormaps import ColormapStore
+    from dpgtheminator.models import ColorsMixin
+
+
+DpgColor = tuple[int, int, int, int]
+
+
+class ResolvedSlot(typing.NamedTuple):
+    field: str
+    constant: int
+    category: int
+
+
+class Backend(abc.ABC):
+    '''The subset of dearpygui the controller uses'''
+
+    def __init__(self):
+        self._slot_tables: dict[type, tuple[ResolvedSlot, ...]] = {}
+        self._colormap_store: 'ColormapStore | None' = None
+
+    @abc.abstractmethod
+    def constant(self, name: str) -> int:
+        '''Value of a dearpygui constant, e.g. mvThemeCol_Text'''
+
+    def resolve_slots(self, colors_type: type['ColorsMixin']) -> tuple[ResolvedSlot, ...]:
+        '''colors_type.dpg_slots with constant names resolved, built once per class'''
+        table = self._slot_tables.get(colors_type)
+        if table is None:
+            table = tuple(
+                ResolvedSlot(slot.field, self.constant(slot.constant), self.constant(slot.category))
+                for slot in colors_type.dpg_slots
+            )
+            self._slot_tables[colors_type] = table
+        return table
+
+    @property
+    def colormap_store(self) -> 'ColormapStore':
+        '''The colormap items every theme on this backend shares'''
+        if self._colormap_store is None:
+            from dpgtheminator.colormaps import ColormapStore
+            self._colormap_store = ColormapStore(self)
+        return self._colormap_store
+
+    @abc.abstractmethod
+    def add_theme(self) -> int: ...
+
+    @abc.abstractmethod
+    def add_theme_component(self, item_type: int, parent: int) -> int: ...
+
+    @abc.abstractmethod
+    def add_theme_color(self, target: int, value: DpgColor, category: int, parent: int) -> int: ...
+
+    @abc.abstractmethod
+    def add_colormap_registry(self) -> int: ...
+
+    @abc.abstractmethod
+    def add_colormap(self, colors: list[DpgColor], qualitative: bool, parent: int) -> int: ...
+
+    @abc.abstractmethod
+    def set_value(self, item: int, value: typing.Any): ...
+
+    @abc.abstractmethod
+    def delete_item(self, item: int):
+        '''Delete item and all of its children'''
+
+    @abc.abstractmethod
+    def does_item_exist(self, item: int | str) -> bool: ...
+
+    @abc.abstractmethod
+    def bind_theme(self, theme: int): ...
+
+    @abc.abstractmethod
+    def bind_item_theme(self, item: int | str, theme: int): ...
+
+    def bind_item_themes(self, items: Iterable[int | str], theme: int):
+        '''Bind theme to every item; 0 unbinds'''
+        for item in items:
+            self.bind_item_theme(item, theme)
+
+    @abc.abstractmethod
+    def bind_colormap(self, item: int | str, colormap: int): ...
+
+    def bind_colormaps(self, items: Iterable[int | str], colormap: int):
+        '''Bind colormap to every item'''
+        for item in items:
+            self.bind_colormap(item, colormap)
+
+    @abc.abstractmethod
+    def get_frame_count(self) -> int: ...
+
+    @abc.abstractmethod
+    def set_frame_callback(self, frame: int, callback: Callable):
+        '''Call callback(sender, app_data, user_data) when frame renders.
+
+        Any number of callbacks can be set for the same frame; they run in
+        the order they were set.
+        '''
+
+
+class DearPyGuiBackend(Backend):
+    def __init__(self):
+        super().__init__()
+        import dearpygui.dearpygui as dpg  # type: ignore
+        from dpgtheminator.models import MV_ALL
+        assert MV_ALL == dpg.mvAll, 'models.MV_ALL no longer matches dearpygui'
+        self.dpg = dpg
+        # dearpygui keeps one callback per frame, so ours are gathered here
+        # and run from a single one
+        self._frame_callbacks: dict[int, list[Callable]] = {}
+        self._frame_lock = threading.Lock()
+
+    def constant(self, name: str) -> int:
+        return getattr(self.dpg, name)
+
+    def add_theme(self) -> int:
+        return self.dpg.add_theme()
+
+    def add_theme_component(self, item_type: int, parent: int) -> int:
+        return self.dpg.add_theme_component(item_type, parent=parent)
+
+    def add_theme_color(self, target: int, value: DpgColor, category: int, parent: int) -> int:
+        return self.dpg.add_theme_color(target, value, category=category, parent=parent)
+
+    def add_colormap_registry(self) -> int:
+        return self.dpg.add_colormap_registry()
+
+    def add_colormap(self, colors: list[DpgColor], qualitative: bool, parent: int) -> int:
+        return self.dpg.add_colormap(colors, qualitative, parent=parent)
+
+    def set_value(self, item: int, value: typing.Any):
+        self.dpg.set_value(item, value)
+
+    def delete_item(self, item: int):
+        self.dpg.delete_item(item)
+
+    def does_item_exist(self, item: int | str) -> bool:
+        return self.dpg.does_item_exist(item)
+
+    def bind_theme(self, theme: int):
+        self.dpg.bind_theme(theme)
+
+    def bind_item_theme(self, item: int | str, theme: int):
+        self.dpg.bind_item_theme(item, theme)
+
+    def bind_item_themes(self, items: Iterable[int | str], theme: int):
+        bind_item_theme = self.dpg.bind_item_theme
+        for item in items:
+            bind_item_theme(item, theme)
+
+    def bind_colormap(self, item: int | str, colormap: int):
+        self.dpg.bind_colormap(item, colormap)
+
+    def bind_colormaps(self, items: Iterable[int | str], colormap: int):
+        bind_colormap = self.dpg.bind_colormap
+        for item in items:
+            bind_colormap(item, colormap)
+
+    def get_frame_count(self) -> int:
+        return self.dpg.get_frame_count()
+
+    def set_frame_callback(self, frame: int, callback: Callable):
+        with self._frame_lock:
+            callbacks = self._frame_callbacks.setdefault(frame, [])
+            callbacks.append(callback)
+            first = len(callbacks) == 1
+        if first:
+            self.dpg.set_frame_callback(frame, self._run_frame_callbacks, user_data=frame)
+
+    def _run_frame_callbacks(self, sender, app_data, frame: int):
+        with self._frame_lock:
+            callbacks = self._frame_callbacks.pop(frame, [])
+        for callback in callbacks:
+            callback(sender, app_data, None)
+
+
+@dataclasses.dataclass
+class RecordedItem:
+    kind: str
+    parent: int | None
+    value: typing.Any = None
+    args: dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+    children: list[int] = dataclasses.field(default_factory=list)
+
+
+class RecordingBackend(Backend):
+    '''Headless backend that records items and calls in memory.
+
+    Constants resolve to small stable integers; constant_names maps them
+    back. Frame callbacks run when render_frame() is called. Items it didn't
+    create, e.g. bind targets, exist until delete_item() is called on them.
+    '''
+    def __init__(self):
+        super().__init__()
+        self.constants: dict[str, int] = {}
+        self.constant_names: dict[int, str] = {}
+        self.items: dict[int, RecordedItem] = {}
+        self.calls: collections.Counter[str] = collections.Counter()
+        self.created_count = 0
+        self.deleted_count = 0
+        self.bound_theme: int | None = None
+        self.item_themes: dict[int | str, int] = {}
+        self.item_colormaps: dict[int | str, int] = {}
+        self.frame_count = 0
+        self.frame_callbacks: dict[int, list[Callable]] = {}
+        self.deleted_targets: set[int | str] = set()
+        self._next_id = 1
+
+    @property
+    def item_count(self) -> int:
+        return len(self.items)
+
+    def constant(self, name: str) -> int:
+        value = self.constants.get(name)
+        if value is None:
+            value = len(self.constants)
+            self.constants[name] = value
+            self.constant_names[value] = name
+        return value
+
+    def _add(self, kind: str, parent: int | None, value: typing.Any = None, **args: typing.Any) -> int:
+        self.calls[f'add_{kind}'] += 1
+        item = self._next_id
+        self._next_id += 1
+        self.items[item] = RecordedItem(kind, parent, value, args)
+        if parent is not None:
+            self.items[parent].children.append(item)
+        self.created_count += 1
+        return item
+
+    def add_theme(self) -> int:
+        return self._add('theme', None)
+
+    def add_theme_component(self, item_type: int, parent: int) -> int:
+        return self._add('theme_component', parent, item_type=item_type)
+
+    def add_theme_color(self, target: int, value: DpgColor, category: int, parent: int) -> int:
+        return self._add('theme_color', parent, value, target=target, category=category)
+
+    def add_colormap_registry(self) -> int:
+        return self._add('colormap_registry', None)
+
+    def add_colormap(self, colors: list[DpgColor], qualitative: bool, parent: int) -> int:
+        return self._add('colormap', parent, colors, qualitative=qualitative)
+
+    def set_value(self, item: int, value: typing.Any):
+        self.calls['set_value'] += 1
+        self.items[item].value = value
+
+    def delete_item(self, item: int | str):
+        self.calls['delete_item'] += 1
+        if item not in self.items:
+            self.deleted_targets.add(item)
+            self.item_themes.pop(item, None)
+            self.item_colormaps.pop(item, None)
+            return
+        recorded = self.items[item]
+        if recorded.parent is not None:
+            self.items[recorded.parent].children.remove(item)
+        stack = [item]
+        while stack:
+            current = stack.pop()
+            stack.extend(self.items.pop(current).children)
+            self.deleted_count += 1
+
+    def does_item_exist(self, item: int | str) -> bool:
+        if item in self.items:
+            return True
+        created = isinstance(item, int) and item < self._next_id
+        return not created and item not in self.deleted_targets
+
+    def bind_theme(self, theme: int):
+        self.calls['bind_theme'] += 1
+        self.bound_theme = theme
+
+    def bind_item_theme(self, item: int | str, theme: int):
+        self.calls['bind_item_theme'] += 1
+        if theme:
+            self.item_themes[item] = theme
+        else:
+            self.item_themes.pop(item, None)
+
+    def bind_colormap(self, item: int | str, colormap: int):
+        self.calls['bind_colormap'] += 1
+        if colormap:
+            self.item_colormaps[item] = colormap
+        else:
+            self.item_colormaps.pop(item, None)
+
+    def get_frame_count(self) -> int:
+        return self.frame_count
+
+    def set_frame_callback(self, frame: int, callback: Callable):
+        self.frame_callbacks.setdefault(frame, []).append(callback)
+
+    def render_frame(self):
+        '''Advance one frame, running any frame callbacks set for it'''
+        self.frame_count += 1
+        for callback in self.frame_callbacks.pop(self.frame_count, []):
+            callback(None, None, None)
+
+
+_default_backend: Backend | None = None
+
+
+def default_backend() -> Backend:
+    '''The backend new controllers use, a DearPyGuiBackend unless set_default_backend() was called'''
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = DearPyGuiBackend()
+    return _default_backend
+
+
+def set_default_backend(backend: Backend | None):
+    global _default_backend
+    _default_backend = backend
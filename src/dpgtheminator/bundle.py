@@ -0,0 +1,109 @@
+'''Pre-built binary bundle of the default themes and palettes.
+
+defaults.bundle packs every JSON file under default_themes/ and
+default_palettes/ into one file, built by scripts/generate_bundle.py:
+
+    magic (8 bytes) | index length (u32, little endian) | msgpack index | payloads
+
+The index maps each name to the (offset, length) of its msgpack encoded
+payload, relative to the end of the index. At runtime the file is memory
+mapped once and each theme decoded on demand straight from a memoryview
+slice, so a default theme costs neither a file read nor a JSON parse.
+
+The JSON files remain the source of truth; rerun the script after editing
+them.
+'''
+import functools
+import importlib.resources
+import mmap
+import pathlib
+import struct
+
+import msgspec
+
+import dpgtheminator
+from dpgtheminator.models import Palette
+from dpgtheminator.models import Theme
+
+
+MAGIC = b'DPGTB\x00\x00\x01'
+_HEADER = struct.Struct('<8sI')
+BUNDLE_RESOURCE = 'defaults.bundle'
+
+
+class BundleIndex(msgspec.Struct):
+    themes: dict[str, tuple[int, int]] = {}
+    palettes: dict[str, tuple[int, int]] = {}
+
+
+class BundleError(Exception):
+    pass
+
+
+_theme_decoder = msgspec.msgpack.Decoder(Theme)
+_palette_decoder = msgspec.msgpack.Decoder(Palette)
+
+
+class Bundle:
+    def __init__(self, buffer: 'bytes|mmap.mmap'):
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        if len(self._view) < _HEADER.size:
+            raise BundleError('Truncated bundle header')
+        magic, index_length = _HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            raise BundleError(f'Not a theme bundle, or an incompatible version: {magic!r}')
+        index_end = _HEADER.size + index_length
+        self.index = msgspec.msgpack.decode(self._view[_HEADER.size:index_end], type=BundleIndex)
+        self._payloads = self._view[index_end:]
+
+    @classmethod
+    def open(cls, path: pathlib.Path) -> 'Bundle':
+        with path.open('rb') as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @property
+    def theme_names(self) -> list[str]:
+        return list(self.index.themes)
+
+    @property
+    def palette_names(self) -> list[str]:
+        return list(self.index.palettes)
+
+    def _payload(self, entries: dict[str, tuple[int, int]], name: str) -> memoryview:
+        offset, length = entries[name]
+        return self._payloads[offset:offset + length]
+
+    def theme(self, name: str) -> Theme:
+        '''A freshly decoded Theme; raises KeyError if name is not bundled'''
+        return _theme_decoder.decode(self._payload(self.index.themes, name))
+
+    def palette(self, name: str) -> Palette:
+        '''A freshly decoded Palette; raises KeyError if name is not bundled'''
+        return _palette_decoder.decode(self._payload(self.index.palettes, name))
+
+
+def encode(themes: dict[str, Theme], palettes: dict[str, Palette]) -> bytes:
+    index = BundleIndex()
+    payloads = bytearray()
+    encoder = msgspec.msgpack.Encoder()
+    for entries, items in ((index.themes, themes), (index.palettes, palettes)):
+        for name, item in items.items():
+            encoded = encoder.encode(item)
+            entries[name] = (len(payloads), len(encoded))
+            payloads += encoded
+    encoded_index = encoder.encode(index)
+    return _HEADER.pack(MAGIC, len(encoded_index)) + encoded_index + bytes(payloads)
+
+
+@functools.cache
+def default_bundle() -> Bundle | None:
+    '''The bundle shipped with the package, or None if it is missing or unusable'''
+    resource = importlib.resources.files(dpgtheminator) / BUNDLE_RESOURCE
+    try:
+        if isinstance(resource, pathlib.Path):
+            return Bundle.open(resource)
+        # Not on a real filesystem, e.g. zipped; nothing to map
+        return Bundle(resource.read_bytes())
+    except (OSError, ValueError, BundleError, msgspec.DecodeError):
+        return None
@@ -0,0 +1,79 @@
+'''Colormap items shared by content across every theme on a backend.
+
+Each distinct colormap is built once, under a single colormap registry,
+and reference counted by the compiled themes using it. Reloading a theme,
+or switching to another with the same colormaps, reuses the existing
+items, so plots bound to them need no rebinding. Colormaps no theme uses
+any more are kept in a small LRU in case they come back, then deleted.
+'''
+import collections
+import typing
+
+from dpgtheminator.models import Color
+
+if typing.TYPE_CHECKING:
+    from dpgtheminator.backends import Backend
+    from dpgtheminator.backends import DpgColor
+
+
+ColormapKey = tuple['DpgColor', ...]
+
+
+def colormap_key(colormap: tuple[Color, ...]) -> ColormapKey:
+    '''The colors DPG would be given for colormap, which is what items are shared by'''
+    return tuple(color.get_dpg_color() for color in colormap)
+
+
+class ColormapStore:
+    def __init__(self, backend: 'Backend', keep: int = 16):
+        self.backend = backend
+        self.keep = keep
+        self.registry: int | None = None
+        self.items: dict[ColormapKey, int] = {}
+        self.refcounts: collections.Counter[ColormapKey] = collections.Counter()
+        # Built but unreferenced, oldest first
+        self.unused: collections.OrderedDict[ColormapKey, None] = collections.OrderedDict()
+
+    def acquire(self, colormaps: list[tuple[Color, ...]]) -> tuple[list[ColormapKey], list[int]]:
+        '''Keys and items for colormaps, building only ones not seen before'''
+        keys = [colormap_key(colormap) for colormap in colormaps]
+        items = []
+        for key in keys:
+            item = self.items.get(key)
+            if item is None:
+                if self.registry is None:
+                    self.registry = self.backend.add_colormap_registry()
+                item = self.backend.add_colormap(list(key), qualitative=True, parent=self.registry)
+                self.items[key] = item
+            else:
+                self.unused.pop(key, None)
+            self.refcounts[key] += 1
+            items.append(item)
+        return keys, items
+
+    def release(self, keys: list[ColormapKey]):
+        '''Drop one reference to each key, as returned by acquire()'''
+        for key in keys:
+            self.refcounts[key] -= 1
+            if self.refcounts[key] <= 0:
+                del self.refcounts[key]
+                self.unused[key] = None
+        while len(self.unused) > self.keep:
+            key, _ = self.unused.popitem(last=False)
+            self.backend.delete_item(self.items.pop(key))
+
+    def release_unused(self):
+        '''Delete every colormap item no theme uses'''
+        for key in self.unused:
+            self.backend.delete_item(self.items.pop(key))
+        self.unused.clear()
+        if not self.items and self.registry is not None:
+            self.backend.delete_item(self.registry)
+            self.registry = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def item_count(self) -> int:
+        return len(self.items) + (self.registry is not None)
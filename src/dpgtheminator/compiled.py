@@ -0,0 +1,172 @@
+import collections
+import dataclasses
+import hashlib
+
+import msgspec
+
+from dpgtheminator.backends import Backend
+from dpgtheminator.colormaps import ColormapKey
+from dpgtheminator.models import COLOR_GROUPS
+from dpgtheminator.models import Color
+from dpgtheminator.models import Theme
+
+
+def theme_key(theme: Theme) -> bytes:
+    '''Stable content hash of a theme'''
+    return hashlib.blake2b(msgspec.msgpack.encode(theme), digest_size=16).digest()
+
+
+@dataclasses.dataclass
+class CompiledTheme:
+    '''The DPG items built for a Theme, as backend item ids.
+
+    key is the content hash of the colors the items currently hold, or None
+    once they have been edited in place and the hash has not been
+    recomputed. Colormap items belong to the backend's colormap_store and
+    are shared with every other theme using the same colors.
+    '''
+    backend: Backend
+    key: bytes | None
+    dpg_theme: int
+    components: list[int] = dataclasses.field(default_factory=list)
+    component_types: list[int] = dataclasses.field(default_factory=list)
+    colors: dict[tuple[int, str, str], int] = dataclasses.field(default_factory=dict)
+    colormaps: list[int] = dataclasses.field(default_factory=list)
+    colormap_keys: list[ColormapKey] = dataclasses.field(default_factory=list)
+
+    @classmethod
+    def build(cls, backend: Backend, theme: Theme, key: bytes | None = None) -> 'CompiledTheme':
+        compiled = cls(backend, key, backend.add_theme())
+        for index, component in enumerate(theme.components):
+            dpg_component = backend.add_theme_component(component.component, parent=compiled.dpg_theme)
+            compiled.components.append(dpg_component)
+            compiled.component_types.append(component.component)
+            for group, colors_type in COLOR_GROUPS.items():
+                colors = getattr(component, group)
+                if colors is None:
+                    continue
+                for field, constant, category in backend.resolve_slots(colors_type):
+                    color = getattr(colors, field)
+                    if color is None:
+                        continue
+                    compiled.colors[(index, group, field)] = backend.add_theme_color(
+                        constant,
+                        color.get_dpg_color(),
+                        category=category,
+                        parent=dpg_component,
+                    )
+        compiled._build_colormaps(theme)
+        return compiled
+
+    def can_sync(self, theme: Theme) -> bool:
+        return self.component_types == [component.component for component in theme.components]
+
+    def sync(self, theme: Theme, key: bytes | None = None):
+        '''Update the existing items in place to match theme.
+
+        Only valid when can_sync(theme).
+        '''
+        for index, component in enumerate(theme.components):
+            for group, colors_type in COLOR_GROUPS.items():
+                colors = getattr(component, group)
+                for slot in colors_type.dpg_slots:
+                    color = None if colors is None else getattr(colors, slot.field)
+                    self.set_color(index, group, slot.field, color)
+
+        self._swap_colormaps(theme)
+        self.key = key
+
+    def set_color(self, component_index: int, group: str, field: str, color: Color | None):
+        key = (component_index, group, field)
+        theme_color = self.colors.get(key)
+        if color is None:
+            if theme_color is not None:
+                self.backend.delete_item(theme_color)
+                del self.colors[key]
+        elif theme_color is not None:
+            self.backend.set_value(theme_color, color.get_dpg_color())
+        else:
+            colors_type = COLOR_GROUPS[group]
+            slot = self.backend.resolve_slots(colors_type)[colors_type.dpg_slot_indexes[field]]
+            self.colors[key] = self.backend.add_theme_color(
+                slot.constant,
+                color.get_dpg_color(),
+                category=slot.category,
+                parent=self.components[component_index],
+            )
+        self.key = None
+
+    def set_colormaps(self, theme: Theme):
+        '''Switch just the colormaps to theme's, building only new ones'''
+        self._swap_colormaps(theme)
+        self.key = None
+
+    def release(self):
+        '''Delete every DPG item in this compiled theme'''
+        # Deleting the theme deletes its components and colors with it
+        self.backend.delete_item(self.dpg_theme)
+        self.components = []
+        self.colors = {}
+        self._release_colormaps()
+
+    def _build_colormaps(self, theme: Theme):
+        self.colormap_keys, self.colormaps = self.backend.colormap_store.acquire(theme.colormaps)
+
+    def _swap_colormaps(self, theme: Theme):
+        # Acquire before releasing, so colormaps both themes have are kept
+        previous = self.colormap_keys
+        self._build_colormaps(theme)
+        self.backend.colormap_store.release(previous)
+
+    def _release_colormaps(self):
+        self.backend.colormap_store.release(self.colormap_keys)
+        self.colormap_keys = []
+        self.colormaps = []
+
+    @property
+    def item_count(self) -> int:
+        '''Theme items only; the colormaps are counted by the colormap_store'''
+        return 1 + len(self.components) + len(self.colors)
+
+
+class ThemeCache:
+    '''LRU cache of compiled themes keyed by theme_key().
+
+    Entries are checked out with pop() while in use, so the active theme can
+    be edited in place without its cache key going stale. Evicted entries
+    are released.
+    '''
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = maxsize
+        self.entries: collections.OrderedDict[bytes, CompiledTheme] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self.entries
+
+    def pop(self, key: bytes) -> CompiledTheme | None:
+        return self.entries.pop(key, None)
+
+    def put(self, key: bytes, compiled: CompiledTheme):
+        if self.maxsize <= 0:
+            compiled.release()
+            return
+        previous = self.entries.pop(key, None)
+        if previous is not None and previous is not compiled:
+            previous.release()
+        compiled.key = key
+        self.entries[key] = compiled
+        while len(self.entries) > self.maxsize:
+            _, evicted = self.entries.popitem(last=False)
+            evicted.release()
+
+    def clear(self):
+        for compiled in self.entries.values():
+            compiled.release()
+        self.entries.clear()
+
+    @property
+    def item_count(self) -> int:
+        return sum(compiled.item_count for compiled in self.entries.values())
@@ -0,0 +1,13 @@
+'''Console script entry points, importable without the optional extras'''
+import sys
+
+
+def audit() -> int:
+    try:
+        from dpgtheminator.audit import main
+    except ImportError as error:
+        if error.name != 'numpy':
+            raise
+        print('dpgtheminator-audit needs numpy; install it with: pip install "dpgtheminator[numpy]"', file=sys.stderr)
+        return 1
+    return main()
@@ -1,29 +1,89 @@
+import collections
 import dataclasses
 import functools
 import importlib.resources
 import pathlib
+import threading
+import typing
 
-import dearpygui.dearpygui as dpg  # type: ignore
-from dpgcontainers.base import DPGContainersBase
-import dpgcontainers.containers as dpgc
 import msgspec
 
 import dpgtheminator
 from dpgtheminator import exceptions
+from dpgtheminator.backends import Backend
+from dpgtheminator.backends import default_backend
+from dpgtheminator.bundle import default_bundle
+from dpgtheminator.compiled import CompiledTheme
+from dpgtheminator.compiled import ThemeCache
+from dpgtheminator.compiled import theme_key
+from dpgtheminator.models import Color
 from dpgtheminator.models import Theme
-from dpgtheminator.gui.theminator import Theminator
+from dpgtheminator.overlay import make_overlay
+from dpgtheminator.overlay import resolve
+from dpgtheminator.patch import Patch
+from dpgtheminator.patch import apply_colormap_changes
+from dpgtheminator.patch import apply_patch
+from dpgtheminator.patch import set_slot
+from dpgtheminator.util import copy_theme
+from dpgtheminator.util import item_id
+
+if typing.TYPE_CHECKING:
+    from dpgcontainers.base import DPGContainersBase
+    from dpgtheminator.registry import ThemeRegistry
+    from dpgtheminator.transition import ThemeTransition
+    from dpgtheminator.watch import ThemeWatcher
+
 
 @dataclasses.dataclass
 class Controller:
     name: str | None = None
     theme: Theme | None = None
-    dpg_theme: dpgc.Theme | None = None
+    compiled: CompiledTheme | None = None
+    theme_cache: ThemeCache = dataclasses.field(default_factory=ThemeCache)
     loaded: bool = False
-    dpg_colormaps: list[dpgc.Colormap] = dataclasses.field(default_factory=list)
-    colormap_bindings: list[tuple[int, int|str|None]] = dataclasses.field(default_factory=list)
+    # target -> index of the colormap bind_colormap() was called with
+    colormap_bindings: dict[int|str, int] = dataclasses.field(default_factory=dict)
+    # target -> colormap item it is bound to right now
+    bound_colormaps: dict[int|str, int] = dataclasses.field(default_factory=dict)
+    # Targets bind() was called with, None meaning the global theme
+    theme_bindings: list[int|str|None] = dataclasses.field(default_factory=list)
     theme_path: pathlib.Path | None = None
     is_default_theme: bool = True
+    pending_colors: dict[tuple[int, str, str], Color | None] = dataclasses.field(default_factory=dict)
+    pending_load: tuple[Theme, str] | None = None
+    pending_colormaps: list[tuple[Color, ...]] | None = None
+    flush_on_frame: bool = True
+    # Frame a flush is scheduled for, None if none is
+    flush_frame: int | None = None
+    pending_lock: threading.Lock = dataclasses.field(default_factory=threading.Lock, repr=False)
+    backend: Backend = dataclasses.field(default_factory=default_backend, repr=False)
+    # Where load(str) looks first; the GUI sets up a preloaded one if unset
+    registry: 'ThemeRegistry | None' = dataclasses.field(default=None, repr=False)
+    transition: 'ThemeTransition | None' = dataclasses.field(default=None, repr=False)
+    # Started by watch(); follows theme_path as other files are loaded
+    watcher: 'ThemeWatcher | None' = dataclasses.field(default=None, repr=False)
+    # Load overlays merged over their base themes, rather than as only the
+    # slots they override. The merged theme keeps base, and save() writes
+    # just the differences from it again
+    resolve_base: bool = False
+
+    @property
+    def dpg_theme(self) -> int | None:
+        if self.compiled is None:
+            return None
+        return self.compiled.dpg_theme
 
+    @property
+    def dpg_colormaps(self) -> list[int]:
+        if self.compiled is None:
+            return []
+        return self.compiled.colormaps
+
+    @property
+    def dpg_theme_colors(self) -> dict[tuple[int, str, str], int]:
+        if self.compiled is None:
+            return {}
+        return self.compiled.colors
 
     def reload(self):
         self.load(self.theme, self.name)
@@ -31,93 +91,408 @@ class Controller:
 
     @functools.singledispatchmethod
     def load(self, theme: Theme, name: str):
+        theme = self._resolve_overlay(theme)
         self.name = name
-        self.theme = theme
-        self.dpg_theme = dpgc.Theme()
-        for component in theme.components:
-            dpg_component = dpgc.ThemeComponent(component.component)
-            if component.core_colors is not None:
-                dpg_component(*component.core_colors.get_dpg_colors().values())
-            if component.plot_colors is not None:
-                dpg_component(*component.plot_colors.get_dpg_colors().values())
-            if component.node_colors is not None:
-                dpg_component(*component.node_colors.get_dpg_colors().values())
-
-            self.dpg_theme(dpg_component)
-        self.dpg_theme.render()
-
-        self.dpg_colormaps = []
-        if theme.colormaps:
-            registry = dpgc.ColormapRegistry()
-            for colormap in theme.colormaps:
-                dpg_colormap = dpgc.Colormap(
-                    list(color.get_dpg_color() for color in colormap),
-                    qualitative=True,
-                )
-                registry(dpg_colormap)
-                self.dpg_colormaps.append(dpg_colormap)
-            registry.render()
+        if self.transition is not None:
+            # Loading wins over a crossfade still in progress
+            self.transition.cancel()
+            self.transition = None
+        # Queued changes were meant for the previous theme
+        with self.pending_lock:
+            self.pending_colors = {}
+            self.pending_colormaps = None
 
+        key = theme_key(theme)
+        previous = self.compiled
+        if previous is not None:
+            previous_key = previous.key
+            if previous_key is None and self.theme is not None:
+                previous_key = theme_key(self.theme)
+            if previous_key == key and previous.can_sync(theme):
+                # Reloading the same content; push the struct values back
+                # into the existing items
+                previous.sync(theme, key)
+                previous = None
+            elif previous_key is not None and self.theme_cache.maxsize > 0:
+                self.theme_cache.put(previous_key, previous)
+                self.compiled = None
+            elif previous.can_sync(theme):
+                previous.sync(theme, key)
+                previous = None
+            else:
+                previous.release()
+                self.compiled = None
+
+        if self.compiled is None:
+            cached = self.theme_cache.pop(key)
+            if cached is not None:
+                self.compiled = cached
+            else:
+                self.compiled = CompiledTheme.build(self.backend, theme, key)
+
+        self.theme = theme
         self.loaded = True
         return self
 
+    def transition_to(self, theme: 'Theme|str', duration: float = 0.3, name: str | None = None, fps: int = 60):
+        '''Crossfade the live theme to theme over duration seconds.
+
+        Needs numpy. The existing items are updated frame by frame instead
+        of building new ones; themes with different components are simply
+        loaded. A transition already running jumps to its end first.
+        '''
+        from dpgtheminator.transition import ThemeTransition
+
+        if self.theme is None or self.compiled is None or self.name is None:
+            raise exceptions.ThemeNotLoaded()
+        if isinstance(theme, str):
+            theme, resolved_name = self._resolve_named(theme)
+            name = resolved_name if name is None else name
+        name = self.name if name is None else name
+        theme = self._resolve_overlay(theme)
+        if self.transition is not None:
+            self.transition.finish()
+        self.flush()
+        if not self.compiled.can_sync(theme):
+            self.load(theme, name)
+            self.rebind()
+            self.rebind_colormaps()
+            return self
+        self.transition = ThemeTransition(self, theme, name, duration, fps).start()
+        return self
+
+    def release(self):
+        '''Delete every DPG item this controller has created, cached or not.
+
+        Colormaps still used by another controller's themes are kept.
+        '''
+        if self.compiled is not None:
+            self.compiled.release()
+            self.compiled = None
+        self.theme_cache.clear()
+        self.backend.colormap_store.release_unused()
+        self.bound_colormaps.clear()
+        self.loaded = False
+        return self
+
+    @property
+    def item_count(self) -> int:
+        '''Number of live theme items owned by this controller.
+
+        Colormaps are shared, and counted by backend.colormap_store instead.
+        '''
+        count = self.theme_cache.item_count
+        if self.compiled is not None:
+            count += self.compiled.item_count
+        return count
+
     @load.register
     def _(self, theme: pathlib.Path):
-        self.theme_path = theme
-        self.is_default_theme = False
-        name = theme.name
-        content = theme.read_bytes()
-        loaded = msgspec.json.decode(content, type=Theme)
-        return self.load(loaded, name)
+        return self.load(*self._resolve_path(theme))
 
     @load.register
     def _(self, theme: str):
-        try:
-            content = importlib.resources.read_binary(dpgtheminator, f'default_themes/{theme}.json')
-        except FileNotFoundError:
-            return self.load(pathlib.Path(theme))
-        else:
-            self.is_default_theme = True
-            loaded = msgspec.json.decode(content, type=Theme)
-            return self.load(loaded, theme)
+        return self.load(*self._resolve_named(theme))
+
+    def _resolve_path(self, path: pathlib.Path) -> tuple[Theme, str]:
+        theme, name, _ = self.find_theme(path)
+        self._set_theme_path(path)
+        return theme, name
+
+    def _resolve_named(self, theme: str) -> tuple[Theme, str]:
+        found, name, path = self.find_theme(theme)
+        self._set_theme_path(path)
+        return found, name
+
+    def _set_theme_path(self, path: pathlib.Path | None):
+        '''Note the file the theme being loaded came from, None for a default theme'''
+        self.is_default_theme = path is None
+        if path is not None:
+            self.theme_path = path
+        if self.watcher is None:
+            return
+        if path is None:
+            self.watcher.stop()
+            self.watcher = None
+        elif path != self.watcher.path:
+            self.watcher.follow(path)
+
+    def find_theme(self, theme: 'str|pathlib.Path', relative_to: pathlib.Path | None = None) -> tuple[Theme, str, pathlib.Path | None]:
+        '''Look a theme up by name, or by path (relative_to a directory).
+
+        Returns the theme, its name, and the file it came from - None for
+        default themes. Nothing about the controller changes.
+        '''
+        if isinstance(theme, str):
+            if self.registry is not None and theme in self.registry:
+                entry = self.registry.themes[theme]
+                return self.registry.theme(theme), theme, entry.path
+            defaults = default_bundle()
+            if defaults is not None and theme in defaults.index.themes:
+                return defaults.theme(theme), theme, None
+            try:
+                content = importlib.resources.read_binary(dpgtheminator, f'default_themes/{theme}.json')
+            except FileNotFoundError:
+                pass
+            else:
+                return msgspec.json.decode(content, type=Theme), theme, None
+        path = pathlib.Path(theme)
+        if relative_to is not None and not path.is_absolute() and (relative_to / path).exists():
+            path = relative_to / path
+        content = path.read_bytes()
+        return msgspec.json.decode(content, type=Theme), path.name, path
+
+    def _find_base(self, name: str) -> Theme:
+        relative_to = None if self.theme_path is None else self.theme_path.parent
+        return self.find_theme(name, relative_to)[0]
+
+    def _resolve_overlay(self, theme: Theme) -> Theme:
+        if not self.resolve_base or theme.base is None:
+            return theme
+        # Resolving an already resolved theme gives the same theme back, so
+        # reloads need not tell the two apart
+        resolved = resolve(theme, self._find_base)
+        resolved.base = theme.base
+        return resolved
+
+    def _theme_to_save(self) -> Theme:
+        assert self.theme is not None
+        if not self.resolve_base or self.theme.base is None:
+            return self.theme
+        base = resolve(self._find_base(self.theme.base), self._find_base)
+        return make_overlay(base, self.theme, self.theme.base)
+
+    def update_color(self, component_index: int, group: str, field: str, color: Color | None):
+        '''Set a single color slot, changing only its live ThemeColor item.
+
+        Unlike reload(), nothing is rebuilt or rebound - the existing DPG item
+        is updated in place, so this is cheap enough to call from a color
+        picker callback.
+        '''
+        if self.theme is None or self.compiled is None:
+            raise exceptions.ThemeNotLoaded()
+
+        set_slot(self.theme, component_index, group, field, color)
+        self.compiled.set_color(component_index, group, field, color)
+        return self
+
+    def apply_patch(self, patch: Patch, queue: bool = False):
+        '''Apply a patch.Patch to the live theme.
+
+        Slot changes update their items in place; structural patches load a
+        patched copy of the theme and rebind it. With queue, everything goes
+        through queue_color/queue_load instead.
+        '''
+        if self.theme is None or self.name is None:
+            raise exceptions.ThemeNotLoaded()
+        if patch.structural:
+            theme = apply_patch(copy_theme(self.theme), patch)
+            if queue:
+                self.queue_load(theme, self.name)
+            else:
+                self.load(theme, self.name)
+                self.rebind()
+                self.rebind_colormaps()
+            return self
+        apply = self.queue_color if queue else self.update_color
+        for change in patch.slots:
+            apply(change.component, change.group, change.field, change.new)
+        if patch.colormaps:
+            colormaps = list(self.theme.colormaps)
+            apply_colormap_changes(colormaps, patch.colormaps)
+            (self.queue_colormaps if queue else self.set_colormaps)(colormaps)
+        return self
+
+    def set_colormaps(self, colormaps: list[tuple[Color, ...]]):
+        '''Replace the colormaps, building only new ones, and rebind targets whose colormap changed'''
+        if self.theme is None or self.compiled is None:
+            raise exceptions.ThemeNotLoaded()
+        self.theme.colormaps = list(colormaps)
+        self.compiled.set_colormaps(self.theme)
+        self.rebind_colormaps()
+        return self
+
+    def queue_color(self, component_index: int, group: str, field: str, color: Color | None):
+        '''Queue a color change to be applied by the next flush().
+
+        Only the latest value per slot is kept, so any number of changes to
+        a slot between flushes cost a single update_color(). With
+        flush_on_frame set, a flush is scheduled for the next rendered frame;
+        otherwise the caller is expected to call flush() itself.
+        '''
+        frame = self.backend.get_frame_count()
+        with self.pending_lock:
+            self.pending_colors[(component_index, group, field)] = color
+            schedule = self._claim_flush(frame)
+        if schedule:
+            self.backend.set_frame_callback(frame + 1, self._flush_frame_callback)
+        return self
+
+    def queue_colormaps(self, colormaps: list[tuple[Color, ...]]):
+        '''Queue set_colormaps() for the next flush()'''
+        frame = self.backend.get_frame_count()
+        with self.pending_lock:
+            self.pending_colormaps = list(colormaps)
+            schedule = self._claim_flush(frame)
+        if schedule:
+            self.backend.set_frame_callback(frame + 1, self._flush_frame_callback)
+        return self
+
+    def queue_load(self, theme: Theme, name: str):
+        '''Queue a full load(), rebinding afterwards, for the next flush().
+
+        Color changes queued before this are dropped, as load() would; ones
+        queued after it are applied on top of the new theme. Safe to call
+        from any thread.
+        '''
+        frame = self.backend.get_frame_count()
+        with self.pending_lock:
+            self.pending_load = (theme, name)
+            self.pending_colors = {}
+            self.pending_colormaps = None
+            schedule = self._claim_flush(frame)
+        if schedule:
+            self.backend.set_frame_callback(frame + 1, self._flush_frame_callback)
+        return self
+
+    def _claim_flush(self, frame: int) -> bool:
+        '''Whether a queue_*() call at frame should schedule a flush; pending_lock held.
+
+        A flush scheduled for a frame that has passed without running - its
+        callback was registered from another thread just too late - is
+        scheduled again.
+        '''
+        if not self.flush_on_frame:
+            return False
+        if self.flush_frame is not None and self.flush_frame > frame:
+            return False
+        self.flush_frame = frame + 1
+        return True
+
+    def flush(self):
+        '''Apply all queued loads and color changes'''
+        with self.pending_lock:
+            pending_load = self.pending_load
+            pending = self.pending_colors
+            pending_colormaps = self.pending_colormaps
+            self.pending_load = None
+            self.pending_colors = {}
+            self.pending_colormaps = None
+            self.flush_frame = None
+        if pending_load is not None:
+            self.load(*pending_load)
+            self.rebind()
+            self.rebind_colormaps()
+        for (component_index, group, field), color in pending.items():
+            self.update_color(component_index, group, field, color)
+        if pending_colormaps is not None:
+            self.set_colormaps(pending_colormaps)
+        return self
+
+    def _flush_frame_callback(self, sender, app_data, user_data):
+        self.flush()
 
     def save_as(self, path: pathlib.Path):
-        encoded = msgspec.json.encode(self.theme)
+        self.flush()
+        encoded = msgspec.json.encode(self._theme_to_save())
         path.write_bytes(encoded)
 
     def save(self):
         if self.is_default_theme:
             raise exceptions.CannotSaveOverDefaultTheme()
-        encoded = msgspec.json.encode(self.theme)
+        self.flush()
+        encoded = msgspec.json.encode(self._theme_to_save())
         self.theme_path.write_bytes(encoded)
 
-    def bind(self, target: str|int|DPGContainersBase|None = None):
+    def bind(self, target: 'str|int|DPGContainersBase|None' = None):
         if self.dpg_theme is None:
             raise exceptions.ThemeNotLoaded()
+        if target is not None:
+            target = item_id(target)
+        if target not in self.theme_bindings:
+            self.theme_bindings.append(target)
         if target is None:
-            dpg.bind_theme(self.dpg_theme.id_)  # type: ignore
+            self.backend.bind_theme(self.dpg_theme)
             return self
-        if isinstance(target, DPGContainersBase):
-            target = target.id_
-        dpg.bind_item_theme(target, self.dpg_theme.id_)  # type: ignore
+        self.backend.bind_item_theme(target, self.dpg_theme)
+        return self
+
+    def unbind(self, target: 'str|int|DPGContainersBase|None' = None):
+        '''Remove the theme from target, or as the global theme, and stop rebinding it'''
+        if target is not None:
+            target = item_id(target)
+        if target in self.theme_bindings:
+            self.theme_bindings.remove(target)
+        if target is None:
+            self.backend.bind_theme(0)
+        elif self.backend.does_item_exist(target):
+            self.backend.bind_item_theme(target, 0)
+        return self
+
+    def rebind(self):
+        '''Bind the current theme to every target bind() has been called with.
+
+        Targets deleted since are forgotten.
+        '''
+        for target in list(self.theme_bindings):
+            if target is not None and not self.backend.does_item_exist(target):
+                self.theme_bindings.remove(target)
+                continue
+            self.bind(target)
         return self
 
-    def bind_colormap(self, index: int, target: str|int|DPGContainersBase):
-        self.dpg_colormaps[index].bind(target)
-        if isinstance(target, DPGContainersBase):
-            cache_target: int|str = target.id_
-        else:
-            cache_target = target
+    def bind_colormap(self, index: int, target: 'str|int|DPGContainersBase'):
+        cache_target = item_id(target)
+        colormap = self.dpg_colormaps[index]
+        self.backend.bind_colormap(cache_target, colormap)
+        self.colormap_bindings[cache_target] = index
+        self.bound_colormaps[cache_target] = colormap
 
-        self.colormap_bindings.append((index, cache_target))
+    def unbind_colormap(self, target: 'str|int|DPGContainersBase'):
+        '''Give target back the default colormap, and stop rebinding it'''
+        cache_target = item_id(target)
+        self.colormap_bindings.pop(cache_target, None)
+        self.bound_colormaps.pop(cache_target, None)
+        if self.backend.does_item_exist(cache_target):
+            self.backend.bind_colormap(cache_target, 0)
+        return self
 
     def rebind_colormaps(self):
-        known_bindings = self.colormap_bindings
-        self.colormap_bindings = []
-        for index, target in known_bindings:
-            self.bind_colormap(index, target)
+        '''Bind the current colormaps to every target bind_colormap() has been called with.
+
+        Colormap items are shared by content, so only targets whose item
+        actually changed are rebound, in one batch per colormap. Targets
+        whose index the theme has no colormap for are left as they are, and
+        bound again by a later theme that has it. Targets deleted since are
+        forgotten.
+        '''
+        for target in [target for target in self.colormap_bindings if not self.backend.does_item_exist(target)]:
+            del self.colormap_bindings[target]
+            self.bound_colormaps.pop(target, None)
+        colormaps = self.dpg_colormaps
+        changed: dict[int, list[int|str]] = collections.defaultdict(list)
+        for target, index in self.colormap_bindings.items():
+            if index < len(colormaps) and self.bound_colormaps.get(target) != colormaps[index]:
+                changed[colormaps[index]].append(target)
+        for colormap, targets in changed.items():
+            self.backend.bind_colormaps(targets, colormap)
+            self.bound_colormaps.update(dict.fromkeys(targets, colormap))
+        return self
+
+    def watch(self, interval: float = 0.25) -> 'ThemeWatcher':
+        '''Start a ThemeWatcher applying outside edits of theme_path, replacing any running one'''
+        from dpgtheminator.watch import ThemeWatcher
+
+        if self.theme_path is None:
+            raise exceptions.NoThemePath()
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.watcher = ThemeWatcher(self, self.theme_path, interval).start()
+        return self.watcher
 
     def show_gui(self):
+        from dpgtheminator.gui.theminator import Theminator
+
         gui = Theminator(self)
         gui.render()
         return self
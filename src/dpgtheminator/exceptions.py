@@ -4,3 +4,11 @@ class ThemeNotLoaded(Exception):
 
 class CannotSaveOverDefaultTheme(Exception):
     pass
+
+
+class NoThemePath(Exception):
+    pass
+
+
+class ThemeBaseCycle(Exception):
+    pass
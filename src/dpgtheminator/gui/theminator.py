@@ -1,4 +1,6 @@
 from __future__ import annotations
+from collections.abc import Callable
+import functools
 import itertools
 from typing import TYPE_CHECKING
 import pathlib
@@ -7,74 +9,183 @@ import uuid
 import msgspec
 
 import dearpygui.dearpygui as dpg
+from dpgcontainers.base import is_rendered
 import dpgcontainers.containers as dpgc
 
 if TYPE_CHECKING:
     from dpgtheminator.controller import Controller
 from dpgtheminator.exceptions import ThemeNotLoaded
+from dpgtheminator.history import EditHistory
+from dpgtheminator.models import COLOR_GROUPS
 from dpgtheminator.models import Color
 from dpgtheminator.models import CoreColors
 from dpgtheminator.models import NodeColors
 from dpgtheminator.models import PlotColors
 from dpgtheminator.models import Palette
-# from dpgtheminator.models import ThemeComponent
+from dpgtheminator.models import ThemeComponent
+from dpgtheminator.patch import Patch
+from dpgtheminator.registry import ThemeRegistry
 
 
 shared_state = {
     'mouse_position': [0, 0],
 }
 
+GROUP_LABELS = {
+    'core_colors': 'Core Colors',
+    'plot_colors': 'Plot Colors',
+    'node_colors': 'Node Colors',
+}
+
+
+@functools.cache
+def _item_type_names() -> dict[int, str]:
+    names = {value: name.removeprefix('mv') for name, value in dpg.get_item_types().items()}
+    names[dpg.mvAll] = 'All'
+    return names
+
+
+def component_label(index: int, item_type: int) -> str:
+    '''e.g. "1: Button" for a component theming mvButton items'''
+    return f'{index}: {_item_type_names().get(item_type, item_type)}'
+
+
+def _normalize(text: str) -> str:
+    # "Scrollbar Grab", scrollbar_grab and ScrollbarGrab all match
+    return text.lower().replace('_', '').replace(' ', '')
+
+
+@functools.cache
+def _slot_search_text() -> dict[tuple[str, str], str]:
+    return {
+        (group, slot.field): f'{_normalize(slot.field)}|{_normalize(slot.constant)}'
+        for group, colors_type in COLOR_GROUPS.items()
+        for slot in colors_type.dpg_slots
+    }
+
+
+class SlotIndex:
+    '''Substring lookup of (group, field) slots by field or DPG constant name.
+
+    The matches for every prefix of the last query are kept, and a query is
+    only searched for within the matches of the longest prefix it shares
+    with the last one, so each keystroke scans the shrinking set left by
+    the one before. Nothing else is kept.
+    '''
+    def __init__(self):
+        self.text = _slot_search_text()
+        self.query = ''
+        # chain[n] holds the matches for query[:n]
+        self.chain: list[frozenset[tuple[str, str]]] = [frozenset(self.text)]
+
+    def match(self, query: str) -> frozenset[tuple[str, str]]:
+        query = _normalize(query)
+        shared = 0
+        limit = min(len(query), len(self.query))
+        while shared < limit and query[shared] == self.query[shared]:
+            shared += 1
+        del self.chain[shared + 1:]
+        found = self.chain[shared]
+        for length in range(shared + 1, len(query) + 1):
+            prefix = query[:length]
+            found = frozenset(key for key in found if prefix in self.text[key])
+            self.chain.append(found)
+        self.query = query
+        return found
+
+
+def _ctrl_down() -> bool:
+    return dpg.is_key_down(dpg.mvKey_LControl) or dpg.is_key_down(dpg.mvKey_RControl)
+
+
 class ColorEditWindow(dpgc.Window):
-    def __init__(self, name: str, color: Color, row: 'ColorRow'):
-        super().__init__(name, show=False, width=310, height=400)
-        self.row = row
+    '''A single editor window, retargeted to whichever row is being edited'''
+    def __init__(self):
+        super().__init__('', show=False, width=310, height=400)
+        self.row: ColorRow|None = None
         self(
-            picker=dpgc.ColorPicker(
-                default_value=color.get_dpg_color(),
-                callback=row.set_color,
-            )
+            picker=dpgc.ColorPicker(callback=self.set_picker_color),
         )
-        self.palette_display: dpgc.DPGContainersBase|None = None
 
-    def add_palette(self, palette: Palette):
-        if self.palette_display is None:
-            self(palette_display=dpgc.ChildWindow()).render()
-            self.palette_display = self.find('palette_display')
+    def edit(self, row: 'ColorRow'):
+        self.row = row
+        self.label = row.name
+        self.refresh()
+        self.configure(pos=shared_state['mouse_position'])
+        self.show = True
+
+    def refresh(self):
+        if self.row is not None:
+            self.find('picker').value = self.row.color.get_dpg_color()
+
+    def set_picker_color(self, sender: int, norm_color: list[float]):
+        if self.row is not None:
+            self.row.set_color(sender, norm_color)
 
-        self.palette_display.clear()
 
-        per_row = 10
+class PaletteView(dpgc.ChildWindow):
+    '''Swatches for the loaded palette, shared by every row'''
+    per_row = 10
+
+    def __init__(self, on_select: Callable[[list[float]], None]):
+        super().__init__(autosize_x=True, autosize_y=True, border=False)
+        self.on_select = on_select
+        self.palette: Palette|None = None
+        self.swatches: list[tuple[dpgc.ColorButton, dpgc.Text]] = []
+
+    def set_palette(self, palette: Palette):
+        if palette == self.palette:
+            return
+        self.palette = palette
         names = palette.names
         if names is None:
             names = itertools.repeat('')
-        for batch in itertools.batched(zip(names, palette.colors), per_row):
+
+        # Same sized palettes (e.g. switching catppuccin flavours) just
+        # update the existing swatches
+        if len(self.swatches) == len(palette.colors):
+            for (button, text), name, color in zip(self.swatches, names, palette.colors):
+                button.value = color.get_dpg_color()
+                text.value = name
+            return
+
+        self.clear()
+        self.swatches = []
+        for batch in itertools.batched(zip(names, palette.colors), self.per_row):
             row = dpgc.Group(horizontal=True)
             for name, color in batch:
-                row(
-                    dpgc.ColorButton(width=20, height=20, default_value=color.get_dpg_color(), callback=self.set_color)(
-                        dpgc.Tooltip('')(
-                            dpgc.Text(name),
-                        ),
-                    ),
-                )
-            self.palette_display(row)
-        self.palette_display.render()
-
-    def set_color(self, sender: int):
+                button = dpgc.ColorButton(width=20, height=20, default_value=color.get_dpg_color(), callback=self.select)
+                text = dpgc.Text(name)
+                row(button(dpgc.Tooltip('')(text)))
+                self.swatches.append((button, text))
+            self(row)
+        self.render()
+
+    def select(self, sender: int):
         dpg_color = dpg.get_value(sender)
-        norm_color = [value / 255 for value in dpg_color]
-        self.row.set_color(-1, norm_color)
-        self.find('picker').value = dpg_color
-
+        self.on_select([value / 255 for value in dpg_color])
 
 
 class ColorRow(dpgc.TableRow):
-    def __init__(self, name: str, color: Color, controller: Controller):
+    def __init__(
+        self,
+        name: str,
+        color: Color,
+        controller: Controller,
+        group: str,
+        on_edit: Callable[[ColorRow], None],
+        component_index: int = 0,
+        history: EditHistory|None = None,
+    ):
         super().__init__()
 
         self.name = name
         self.color = color
         self.controller = controller
+        self.group = group
+        self.on_edit = on_edit
+        self.component_index = component_index
+        self.history = history
 
         self(
             dpgc.Text(name),
@@ -85,23 +196,17 @@ class ColorRow(dpgc.TableRow):
                 callback=self.edit_color,
             ),
         )
-        self.edit_window = ColorEditWindow(name, color, self).render()
-        # self.edit_window = dpgc.Window(name, show=False, width=300, height=300)(
-        #     picker=dpgc.ColorPicker(
-        #         default_value=self.color.get_dpg_color(),
-        #         callback=self.set_color,
-        #     ),
-        # )
 
     def edit_color(self):
-        self.edit_window.render()
-        self.edit_window.configure(pos=shared_state['mouse_position'])
-        self.edit_window.show = True
+        self.on_edit(self)
 
     def set_color(self, sender: int, norm_color: list[float]):
-        self.color.red, self.color.green, self.color.blue, self.color.alpha = norm_color
+        old_color = self.color
+        self.color = Color(*norm_color)
         self.search_named_children('color_button').value = self.color.get_dpg_color()
-        self.controller.reload().bind()
+        self.controller.queue_color(self.component_index, self.group, self.name, self.color)
+        if self.history is not None:
+            self.history.record(self.component_index, self.group, self.name, old_color, self.color)
 
     def reset_color(self, color: Color):
         self.color = color
@@ -109,16 +214,114 @@ class ColorRow(dpgc.TableRow):
 
 
 class ColorsTable(dpgc.Table):
-    def __init__(self, colors: CoreColors|NodeColors|PlotColors, controller: Controller):
+    def __init__(
+        self,
+        colors: CoreColors|NodeColors|PlotColors|None,
+        controller: Controller,
+        group: str,
+        on_edit: Callable[[ColorRow], None],
+        component_index: int = 0,
+        history: EditHistory|None = None,
+    ):
         super().__init__(header_row=False)
+        self.controller = controller
+        self.group = group
+        self.on_edit = on_edit
+        self.component_index = component_index
+        self.history = history
+        # field -> row, for the slots that are set
+        self.rows: dict[str, ColorRow] = {}
         self(
             dpgc.TableColumn(),
             dpgc.TableColumn(),
         )
-        for name in colors.__struct_fields__:
-            color = getattr(colors, name)
-            if color is not None:
-                self(ColorRow(name, color, controller))
+        if colors is not None:
+            for name in colors.__struct_fields__:
+                color = getattr(colors, name)
+                if color is not None:
+                    self.add_row(name, color)
+
+    def add_row(self, name: str, color: Color) -> ColorRow:
+        row = ColorRow(name, color, self.controller, self.group, self.on_edit, self.component_index, self.history)
+        self.rows[name] = row
+        self(row)
+        if is_rendered(self):
+            row.render()
+        return row
+
+    def set_color(self, name: str, color: Color|None) -> bool:
+        '''Show color for a slot, adding or removing its row; True if anything changed'''
+        row = self.rows.get(name)
+        if color is None:
+            if row is None:
+                return False
+            del self.rows[name]
+            if is_rendered(row):
+                row.delete()
+            else:
+                self.remove_child(row)
+        elif row is None:
+            self.add_row(name, color)
+        elif row.color != color:
+            row.reset_color(color)
+        else:
+            return False
+        return True
+
+
+class ComponentView(dpgc.Group):
+    '''The color tables for one ThemeComponent'''
+    def __init__(
+        self,
+        component: ThemeComponent,
+        controller: Controller,
+        on_edit: Callable[[ColorRow], None],
+        component_index: int = 0,
+        history: EditHistory|None = None,
+    ):
+        super().__init__()
+        self.tables: dict[str, ColorsTable] = {}
+        self.headers: dict[str, dpgc.CollapsingHeader] = {}
+        for group, label in GROUP_LABELS.items():
+            table = ColorsTable(getattr(component, group), controller, group, on_edit, component_index, history)
+            header = dpgc.CollapsingHeader(label, default_open=group == 'core_colors', show=bool(table.rows))(
+                **{f'{group}_table': table},
+            )
+            self.tables[group] = table
+            self.headers[group] = header
+            self(header)
+
+    def row(self, group: str, field: str) -> ColorRow|None:
+        return self.tables[group].rows.get(field)
+
+    def set_color(self, group: str, field: str, color: Color|None):
+        table = self.tables[group]
+        if table.set_color(field, color):
+            self.headers[group].show = bool(table.rows)
+
+    def filter(self, matches: frozenset[tuple[str, str]], open_headers: bool = False):
+        '''Show only the rows for matching slots, and headers with any of them'''
+        for group, table in self.tables.items():
+            visible = 0
+            for field, row in table.rows.items():
+                show = (group, field) in matches
+                if row.show != show:
+                    row.show = show
+                visible += show
+            header = self.headers[group]
+            if header.show != bool(visible):
+                header.show = bool(visible)
+            if open_headers and visible and is_rendered(header):
+                header.value = True
+
+    def update(self, component: ThemeComponent):
+        '''Bring the rows in line with component, touching only those that differ'''
+        for group, colors_type in COLOR_GROUPS.items():
+            colors = getattr(component, group)
+            if colors is None and not self.tables[group].rows:
+                continue
+            for field in colors_type.__struct_fields__:
+                self.set_color(group, field, None if colors is None else getattr(colors, field))
 
 
 class Theminator(dpgc.Window):
@@ -128,19 +331,38 @@ class Theminator(dpgc.Window):
 
         super().__init__('dpgTheminator', width=400, height=600)
         self.controller = controller
+        if controller.registry is None:
+            # Decode every known theme in the background while the window
+            # builds, so switching themes never waits on disk or parsing
+            controller.registry = ThemeRegistry().preload()
+        self.registry = controller.registry
+        self.history = EditHistory()
         self.handler_registry = dpgc.HandlerRegistry()(
             dpgc.MouseMoveHandler(callback=self.set_mouse_position),
+            dpgc.KeyPressHandler(key=dpg.mvKey_Z, callback=self.key_undo),
+            dpgc.KeyPressHandler(key=dpg.mvKey_Y, callback=self.key_redo),
         ).render()
 
         self.file_dialog = dpgc.FileDialog(show=False, width=600, height=450)(
             dpgc.FileExtension('.json'),
         ).render()
 
-        # TODO: (202509) satisfies typechecker for now, but should be handling these cases instead
+        # Created on first edit, then shared by every row
+        self.edit_window: ColorEditWindow|None = None
+        self.active_row: ColorRow|None = None
+        self.palette_view = PaletteView(self.set_active_row_color)
+        self.palette_header = dpgc.CollapsingHeader('Palette', default_open=True, show=False)(
+            palette_view=self.palette_view,
+        )
+
         assert controller.theme is not None
-        assert controller.theme.components[0].core_colors is not None
-        assert controller.theme.components[0].plot_colors is not None
-        assert controller.theme.components[0].node_colors is not None
+        # Only the selected component's rows are built; the others are built
+        # the first time they are selected
+        self.views: dict[int, ComponentView] = {}
+        self.component_types: list[int] = []
+        self.component_index = 0
+        self.slot_index = SlotIndex()
+        self.filter_query = ''
 
         self(
             dpgc.MenuBar()(
@@ -152,15 +374,19 @@ class Theminator(dpgc.Window):
                     # dpgc.MenuItem('Generate Palette', callback=self.menu_generate_palette),
                     dpgc.MenuItem('Load Palette', callback=self.menu_load_palette),
                 ),
+                dpgc.Menu('Edit')(
+                    dpgc.MenuItem('Undo', shortcut='Ctrl+Z', callback=self.undo),
+                    dpgc.MenuItem('Redo', shortcut='Ctrl+Y', callback=self.redo),
+                ),
                 dpgc.Menu('Defaults')(
-                    dpgc.Menu('Themes')(
-                        dpgc.MenuItem('Light', user_data='light', callback=self.menu_load_default_theme),
-                        dpgc.MenuItem('Dark', user_data='dark', callback=self.menu_load_default_theme),
-                        dpgc.MenuItem('Catpuccin Frappe', user_data='catppuccin_frappe', callback=self.menu_load_default_theme),
-                        dpgc.MenuItem('Catpuccin Mocha', user_data='catppuccin_mocha', callback=self.menu_load_default_theme),
-                        dpgc.MenuItem('Catpuccin Macchiato', user_data='catppuccin_macchiato', callback=self.menu_load_default_theme),
-                        dpgc.MenuItem('Catpuccin Latte', user_data='catppuccin_latte', callback=self.menu_load_default_theme),
-                    ),
+                    dpgc.Menu('Themes')(*(
+                        dpgc.MenuItem(entry.label, user_data=entry.name, callback=self.menu_load_default_theme)
+                        for entry in self.registry.themes.values()
+                    )),
+                    dpgc.Menu('Palettes')(*(
+                        dpgc.MenuItem(entry.label, user_data=entry.name, callback=self.menu_load_default_palette)
+                        for entry in self.registry.palettes.values()
+                    )),
                     dpgc.MenuItem('Load Dark Theme', callback=self.debug_menu_load_dark_theme),
                     dpgc.MenuItem('Load Frappe Palette', callback=self.debug_menu_load_frappe_palette),
                 ),
@@ -169,16 +395,12 @@ class Theminator(dpgc.Window):
             dpgc.Group(horizontal=True)(
                 theme_name=dpgc.Text(f'Theme: {controller.name}'),  # type: ignore
             ),
-            dpgc.CollapsingHeader('Core Colors', default_open=True)(
-                core_colors_table=ColorsTable(controller.theme.components[0].core_colors, controller),
-            ),
-            dpgc.CollapsingHeader('Plot Colors')(
-                plot_colors_table=ColorsTable(controller.theme.components[0].plot_colors, controller),
-            ),
-            dpgc.CollapsingHeader('Node Colors')(
-                node_colors_table=ColorsTable(controller.theme.components[0].node_colors, controller),
-            ),
+            self.palette_header,
+            filter_input=dpgc.InputText(hint='Filter colors', callback=self.set_filter),
+            component_combo=dpgc.Combo(label='Component', callback=self.select_component),
+            components=dpgc.Group(),
         )
+        self.set_components()
 
     def menu_open(self, sender, app_data, user_data):
         self.file_dialog.configure(
@@ -218,6 +440,9 @@ class Theminator(dpgc.Window):
         self.controller.rebind_colormaps()
         self.on_theme_load()
 
+    def menu_load_default_palette(self, sender, app_data, user_data):
+        self.set_palette(self.registry.palette(user_data))
+
     def load_palette(self, sender: int, app_data: dict[str, str]):
         file_path = pathlib.Path(app_data['file_path_name'])
         content = file_path.read_bytes()
@@ -225,15 +450,23 @@ class Theminator(dpgc.Window):
         self.set_palette(palette)
 
     def set_palette(self, palette: Palette):
-        tables = (
-            'core_colors_table',
-            'plot_colors_table',
-            'node_colors_table',
-        )
-        for table in tables:
-            for child in self.find(table).children:
-                if isinstance(child, ColorRow):
-                    child.edit_window.add_palette(palette)
+        self.palette_view.set_palette(palette)
+        self.palette_header.show = True
+
+    def edit_row(self, row: ColorRow):
+        self.active_row = row
+        if self.edit_window is None:
+            self.edit_window = ColorEditWindow().render()
+        self.edit_window.edit(row)
+
+    def set_active_row_color(self, norm_color: list[float]):
+        if self.active_row is None:
+            return
+        # Each swatch click is its own undo step
+        self.history.seal()
+        self.active_row.set_color(-1, norm_color)
+        if self.edit_window is not None and self.edit_window.row is self.active_row:
+            self.edit_window.refresh()
 
 
     def open_file(self, sender, app_data, user_data):
@@ -242,21 +475,120 @@ class Theminator(dpgc.Window):
         self.controller.rebind_colormaps()
         self.on_theme_load()
 
+    def set_components(self):
+        '''Start over with the controller theme's components, showing the first'''
+        assert self.controller.theme is not None
+        for view in self.views.values():
+            if is_rendered(view):
+                view.delete()
+            else:
+                self.find('components').remove_child(view)
+        self.views = {}
+        self.component_types = [component.component for component in self.controller.theme.components]
+        labels = [component_label(index, item_type) for index, item_type in enumerate(self.component_types)]
+        combo = self.find('component_combo')
+        combo.items = labels
+        combo.default_value = labels[0] if labels else ''
+        if is_rendered(combo):
+            combo.configure(items=labels)
+            combo.value = combo.default_value
+        combo.show = len(labels) > 1
+        if labels:
+            self.show_component(0)
+
+    def select_component(self, sender, app_data: str):
+        self.show_component(int(app_data.split(':', 1)[0]))
+
+    def show_component(self, index: int):
+        assert self.controller.theme is not None
+        current = self.views.get(self.component_index)
+        if current is not None:
+            current.show = False
+        self.component_index = index
+        view = self.views.get(index)
+        if view is None:
+            view = ComponentView(self.controller.theme.components[index], self.controller, self.edit_row, index, self.history)
+            self.views[index] = view
+            components = self.find('components')
+            components(view)
+            if is_rendered(components):
+                view.render()
+        view.show = True
+        self.apply_filter()
+
+    def set_filter(self, sender, query: str):
+        self.filter_query = query
+        self.apply_filter()
+
+    def apply_filter(self):
+        '''Show only the shown component's rows matching filter_query'''
+        view = self.views.get(self.component_index)
+        if view is not None:
+            view.filter(self.slot_index.match(self.filter_query), open_headers=bool(self.filter_query))
+
+    def row(self, component_index: int, group: str, field: str) -> ColorRow|None:
+        '''The row for a slot, if its component has been shown and the slot is set'''
+        view = self.views.get(component_index)
+        return None if view is None else view.row(group, field)
+
     def on_theme_load(self):
-        tables = (
-            'core_colors_table',
-            'plot_colors_table',
-            'node_colors_table',
-        )
-        for table in tables:
-            attr_name = '_'.join(table.split('_')[:-1])
-            theme_colors = getattr(self.controller.theme.components[0], attr_name)
-            for child in self.find(table).children:
-                if isinstance(child, ColorRow):
-                    theme_color = getattr(theme_colors, child.name)
-                    if theme_color is not None:
-                        child.reset_color(theme_color)
-                        child.edit_window.find('picker').set_value(theme_color.get_dpg_color())
+        theme = self.controller.theme
+        assert theme is not None
+        if [component.component for component in theme.components] != self.component_types:
+            self.set_components()
+        else:
+            # Components not built yet are built from the theme when shown
+            for index, view in self.views.items():
+                view.update(theme.components[index])
+            self.apply_filter()
+        self.find('theme_name').value = f'Theme: {self.controller.name}'
+        self.history.clear()
+        self.refresh_edit_window()
+
+    def refresh_edit_window(self):
+        # Rows are deleted when their slot is no longer set
+        if self.active_row is not None and not is_rendered(self.active_row):
+            self.active_row = None
+        if self.edit_window is not None:
+            if self.edit_window.row is not None and not is_rendered(self.edit_window.row):
+                self.edit_window.row = None
+                self.edit_window.show = False
+            self.edit_window.refresh()
+
+    def undo(self):
+        self.apply_history_patch(self.history.undo())
+
+    def redo(self):
+        self.apply_history_patch(self.history.redo())
+
+    def _typing(self) -> bool:
+        # Ctrl+Z / Ctrl+Y in the filter box edit its text, not the theme
+        filter_input = self.find('filter_input')
+        return is_rendered(filter_input) and dpg.is_item_active(filter_input.id_)
+
+    def key_undo(self):
+        if _ctrl_down() and not self._typing():
+            # Ctrl+Shift+Z redoes, as in most editors
+            if dpg.is_key_down(dpg.mvKey_LShift) or dpg.is_key_down(dpg.mvKey_RShift):
+                self.redo()
+            else:
+                self.undo()
+
+    def key_redo(self):
+        if _ctrl_down() and not self._typing():
+            self.redo()
+
+    def apply_history_patch(self, patch: Patch|None):
+        '''Apply an undo or redo patch, updating only the rows it touches'''
+        if patch is None:
+            return
+        self.controller.apply_patch(patch, queue=True)
+        for change in patch.slots:
+            view = self.views.get(change.component)
+            if view is not None:
+                view.set_color(change.group, change.field, change.new)
+        self.apply_filter()
+        self.refresh_edit_window()
 
     def save_as(self, sender, app_data, user_data):
         file_path = pathlib.Path(app_data['file_path_name'])
@@ -269,8 +601,5 @@ class Theminator(dpgc.Window):
         pass
 
     def debug_menu_load_frappe_palette(self):
-        app_data = {
-            'file_path_name': pathlib.Path(__file__).parent.parent / 'default_palettes/catppuccin_frappe.json',
-        }
-        self.load_palette(-1, app_data)
+        self.set_palette(self.registry.palette('catppuccin_frappe'))
 
@@ -0,0 +1,118 @@
+'''Bounded undo/redo history of theme edits.
+
+Entries are patch.Patch objects holding only the slots that changed, never
+whole themes. Successive edits of the same slot within merge_window seconds
+- a color picker drag - collapse into one entry, so undo steps back over
+the whole drag. Once the encoded size of all entries passes max_bytes the
+oldest are dropped.
+
+undo() and redo() return the patch to apply; the caller applies it, e.g.
+with Controller.apply_patch, so nothing is reloaded.
+'''
+import collections
+import time
+
+import msgspec
+
+from dpgtheminator.models import Color
+from dpgtheminator.patch import Patch
+from dpgtheminator.patch import SlotChange
+
+
+_encoder = msgspec.msgpack.Encoder()
+
+
+def _size(patch: Patch) -> int:
+    return len(_encoder.encode(patch))
+
+
+class EditHistory:
+    def __init__(self, max_bytes: int = 256 * 1024, merge_window: float = 0.5):
+        self.max_bytes = max_bytes
+        self.merge_window = merge_window
+        self.undo_entries: collections.deque[tuple[Patch, int]] = collections.deque()
+        self.redo_entries: list[tuple[Patch, int]] = []
+        self.size = 0
+        self._last_record = 0.0
+        self._sealed = True
+
+    def record(self, component_index: int, group: str, field: str, old: Color | None, new: Color | None):
+        '''Record one slot edit, merging it into the last entry if it continues a drag'''
+        now = time.monotonic()
+        merge = (
+            not self._sealed
+            and self.undo_entries
+            and now - self._last_record <= self.merge_window
+        )
+        if merge:
+            last, last_size = self.undo_entries[-1]
+            change = last.slots[0] if len(last.slots) == 1 and not last.structural and not last.colormaps else None
+            if change is not None and (change.component, change.group, change.field) == (component_index, group, field):
+                change.new = new
+                self.size -= last_size
+                last_size = _size(last)
+                self.undo_entries[-1] = (last, last_size)
+                self.size += last_size
+                self._last_record = now
+                self._clear_redo()
+                return
+        self.push(Patch([SlotChange(component_index, group, field, old, new)]))
+        self._sealed = False
+        self._last_record = now
+
+    def push(self, patch: Patch):
+        '''Record a whole patch as one entry'''
+        if not patch:
+            return
+        entry = (patch, _size(patch))
+        self.undo_entries.append(entry)
+        self.size += entry[1]
+        self._sealed = True
+        self._clear_redo()
+        self._trim()
+
+    def seal(self):
+        '''End the current drag, so the next edit starts a new entry'''
+        self._sealed = True
+
+    def _clear_redo(self):
+        self.size -= sum(size for _, size in self.redo_entries)
+        self.redo_entries = []
+
+    def _trim(self):
+        # Always keep the newest entry, however large
+        while self.size > self.max_bytes and len(self.undo_entries) > 1:
+            _, size = self.undo_entries.popleft()
+            self.size -= size
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self.undo_entries)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self.redo_entries)
+
+    def undo(self) -> Patch | None:
+        '''The patch reverting the newest entry, or None if there is nothing to undo'''
+        if not self.undo_entries:
+            return None
+        entry = self.undo_entries.pop()
+        self.redo_entries.append(entry)
+        self._sealed = True
+        return entry[0].inverted()
+
+    def redo(self) -> Patch | None:
+        '''The patch reapplying the last undone entry, or None'''
+        if not self.redo_entries:
+            return None
+        entry = self.redo_entries.pop()
+        self.undo_entries.append(entry)
+        self._sealed = True
+        return entry[0]
+
+    def clear(self):
+        self.undo_entries.clear()
+        self.redo_entries = []
+        self.size = 0
+        self._sealed = True
@@ -1,9 +1,16 @@
 import msgspec
+import types
 import typing
 
-import dearpygui.dearpygui as dpg  # type: ignore
-import dpgcontainers.base
-import dpgcontainers.containers as dpgc
+if typing.TYPE_CHECKING:
+    import dpgcontainers.containers as dpgc
+    from dpgtheminator.backends import Backend
+
+
+# dearpygui constants whose values are needed at class definition time,
+# so that the models don't have to import dearpygui. DearPyGuiBackend
+# checks them against dearpygui
+MV_ALL = 0  # dpg.mvAll
 
 
 def _snake_to_camel(name: str) -> str:
@@ -44,23 +51,58 @@ class Color(msgspec.Struct):
         return (r, g, b, a)
 
 
+class DpgColorSlot(typing.NamedTuple):
+    '''A color field and the names of its dearpygui constants.
+
+    Backends resolve the names to values, see Backend.resolve_slots.
+    '''
+    field: str
+    constant: str
+    category: str
+
+
 class ColorsMixin:
-    def get_dpg_colors(self) -> dict[str, dpgc.ThemeColor]:
+    # Built once per class by _build_dpg_slots, after the struct fields exist
+    dpg_slots: typing.ClassVar[tuple[DpgColorSlot, ...]] = ()
+    dpg_slots_by_field: typing.ClassVar[typing.Mapping[str, DpgColorSlot]] = types.MappingProxyType({})
+    dpg_slot_indexes: typing.ClassVar[typing.Mapping[str, int]] = types.MappingProxyType({})
+
+    def get_dpg_colors(self, backend: 'Backend | None' = None) -> dict[str, 'dpgc.ThemeColor']:
+        '''dpgcontainers ThemeColors for the set slots, with constants from backend's slot table'''
         colors = {}
-        for name in self.__struct_fields__:  # type: ignore
-            color = getattr(self, name)
-            if color is None:
-                continue
-            camel_name = _snake_to_camel(name)
-            const_name = f'{self._dpg_prefix}{camel_name}'  # type: ignore
-            const_value = getattr(dpg, const_name)
-            colors[name] = dpgc.ThemeColor(const_value, color.get_dpg_color(), category=self._dpg_category)  # type: ignore
+        for field in self.dpg_slots_by_field:
+            theme_color = self.get_dpg_theme_color(field, backend)
+            if theme_color is not None:
+                colors[field] = theme_color
         return colors
 
-class CoreColors(msgspec.Struct, ColorsMixin):
+    def get_dpg_theme_color(self, name: str, backend: 'Backend | None' = None) -> 'dpgc.ThemeColor | None':
+        import dpgcontainers.containers as dpgc
+        from dpgtheminator.backends import default_backend
+
+        color = getattr(self, name)
+        if color is None:
+            return None
+        if backend is None:
+            backend = default_backend()
+        slot = backend.resolve_slots(type(self))[self.dpg_slot_indexes[name]]
+        return dpgc.ThemeColor(slot.constant, color.get_dpg_color(), category=slot.category)
+
+
+def _build_dpg_slots(cls: type[ColorsMixin]):
+    slots = []
+    for name in cls.__struct_fields__:  # type: ignore
+        const_name = f'{cls._dpg_prefix}{_snake_to_camel(name)}'  # type: ignore
+        slots.append(DpgColorSlot(name, const_name, cls._dpg_category))  # type: ignore
+    cls.dpg_slots = tuple(slots)
+    cls.dpg_slots_by_field = types.MappingProxyType({slot.field: slot for slot in slots})
+    cls.dpg_slot_indexes = types.MappingProxyType({slot.field: index for index, slot in enumerate(slots)})
+
+
+class CoreColors(msgspec.Struct, ColorsMixin, omit_defaults=True):
     '''CoreColors colors'''
     _dpg_prefix: typing.ClassVar[str] = 'mvThemeCol_'
-    _dpg_category: typing.ClassVar[int] = dpg.mvThemeCat_Core
+    _dpg_category: typing.ClassVar[str] = 'mvThemeCat_Core'
 
     border: Color|None = None
     border_shadow: Color|None = None
@@ -119,10 +161,10 @@ class CoreColors(msgspec.Struct, ColorsMixin):
     window_bg: Color|None = None
 
 
-class PlotColors(msgspec.Struct, ColorsMixin):
+class PlotColors(msgspec.Struct, ColorsMixin, omit_defaults=True):
     '''PlotColors colors'''
     _dpg_prefix: typing.ClassVar[str] = 'mvPlotCol_'
-    _dpg_category: typing.ClassVar[int] = dpg.mvThemeCat_Plots
+    _dpg_category: typing.ClassVar[str] = 'mvThemeCat_Plots'
 
     axis_bg: Color|None = None
     axis_bg_active: Color|None = None
@@ -146,10 +188,10 @@ class PlotColors(msgspec.Struct, ColorsMixin):
     title_text: Color|None = None
 
 
-class NodeColors(msgspec.Struct, ColorsMixin):
+class NodeColors(msgspec.Struct, ColorsMixin, omit_defaults=True):
     '''NodeColors colors'''
     _dpg_prefix: typing.ClassVar[str] = 'mvNodeCol_'
-    _dpg_category: typing.ClassVar[int] = dpg.mvThemeCat_Nodes
+    _dpg_category: typing.ClassVar[str] = 'mvThemeCat_Nodes'
 
     box_selector: Color|None = None
     box_selector_outline: Color|None = None
@@ -169,16 +211,31 @@ class NodeColors(msgspec.Struct, ColorsMixin):
     title_bar_selected: Color|None = None
 
 
-class ThemeComponent(msgspec.Struct):
+for _colors_type in (CoreColors, PlotColors, NodeColors):
+    _build_dpg_slots(_colors_type)
+
+
+# Unset slots and groups are left out when encoding, so sparse themes stay
+# small on disk
+class ThemeComponent(msgspec.Struct, omit_defaults=True):
     core_colors: CoreColors | None = None
     plot_colors: PlotColors | None = None
     node_colors: NodeColors | None = None
-    component: int = dpg.mvAll
+    component: int = MV_ALL
 
 
-class Theme(msgspec.Struct):
+class Theme(msgspec.Struct, omit_defaults=True):
     components: list[ThemeComponent] = list()
     colormaps: list[tuple[Color, ...]] = list()
+    # Name or path of the theme this one overrides, see dpgtheminator.overlay
+    base: str | None = None
+
+
+COLOR_GROUPS: dict[str, type[CoreColors | PlotColors | NodeColors]] = {
+    'core_colors': CoreColors,
+    'plot_colors': PlotColors,
+    'node_colors': NodeColors,
+}
 
 
 class Palette(msgspec.Struct):
@@ -0,0 +1,109 @@
+'''Sparse themes that override only some slots of a base theme.
+
+An overlay is an ordinary Theme that sets only the slots it changes, with
+base naming the theme it was made against:
+
+    overlay = make_overlay(dark, my_dark, 'dark')   # just the differences
+    controller.load(overlay, 'buttons').bind(my_button)
+
+Loaded as is, an overlay builds only its own ThemeColor items, in
+components scoped to whatever item types it lists, and DPG theme
+inheritance supplies everything else from the themes bound further up. To
+use one as a complete theme instead, resolve() it against its base chain,
+or set Controller.resolve_base, which also saves it back as an overlay.
+
+Components are matched by item type, not by position.
+'''
+from collections.abc import Callable
+
+from dpgtheminator import exceptions
+from dpgtheminator.models import COLOR_GROUPS
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+from dpgtheminator.util import copy_theme
+
+
+def _component_for(theme: Theme, item_type: int) -> ThemeComponent | None:
+    for component in theme.components:
+        if component.component == item_type:
+            return component
+    return None
+
+
+def make_overlay(base: Theme, theme: Theme, base_name: str) -> Theme:
+    '''The slots and colormaps of theme that differ from base, based on base_name.
+
+    Slots theme leaves unset but base sets can't be expressed and are
+    dropped.
+    '''
+    theme = copy_theme(theme)
+    components = []
+    for component in theme.components:
+        base_component = _component_for(base, component.component)
+        if base_component is None:
+            components.append(component)
+            continue
+        if component == base_component:
+            continue
+        overlay_component = ThemeComponent(component=component.component)
+        for group, colors_type in COLOR_GROUPS.items():
+            colors = getattr(component, group)
+            base_colors = getattr(base_component, group)
+            if colors is None or colors == base_colors:
+                continue
+            overrides = {}
+            for field in colors_type.__struct_fields__:
+                color = getattr(colors, field)
+                if color is not None and (base_colors is None or getattr(base_colors, field) != color):
+                    overrides[field] = color
+            if overrides:
+                setattr(overlay_component, group, colors_type(**overrides))
+        components.append(overlay_component)
+    colormaps = [] if theme.colormaps == base.colormaps else theme.colormaps
+    return Theme(components, colormaps, base_name)
+
+
+def merge(base: Theme, overlay: Theme) -> Theme:
+    '''A copy of base with every slot overlay sets laid over it'''
+    merged = copy_theme(base)
+    overlay = copy_theme(overlay)
+    for component in overlay.components:
+        target = _component_for(merged, component.component)
+        if target is None:
+            merged.components.append(component)
+            continue
+        for group, colors_type in COLOR_GROUPS.items():
+            colors = getattr(component, group)
+            if colors is None:
+                continue
+            target_colors = getattr(target, group)
+            if target_colors is None:
+                setattr(target, group, colors)
+                continue
+            for field in colors_type.__struct_fields__:
+                color = getattr(colors, field)
+                if color is not None:
+                    setattr(target_colors, field, color)
+    if overlay.colormaps:
+        merged.colormaps = overlay.colormaps
+    return merged
+
+
+def resolve(theme: Theme, lookup: Callable[[str], Theme]) -> Theme:
+    '''theme merged over its whole base chain, as a complete theme.
+
+    lookup returns the theme for a base name, e.g. ThemeRegistry.theme.
+    '''
+    chain = [theme]
+    seen: set[str] = set()
+    while chain[-1].base is not None:
+        name = chain[-1].base
+        if name in seen:
+            raise exceptions.ThemeBaseCycle(f'Theme base chain loops back to {name!r}')
+        seen.add(name)
+        chain.append(lookup(name))
+    resolved = chain.pop()
+    while chain:
+        resolved = merge(resolved, chain.pop())
+    resolved.base = None
+    return resolved
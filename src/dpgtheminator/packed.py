@@ -0,0 +1,137 @@
+'''Array backed theme representation.
+
+Requires numpy, install with the numpy extra: pip install dpgtheminator[numpy]
+
+A PackedTheme holds one float32 array per colors group, shaped
+(components, slots, 4), with rows ordered by SLOT_INDEX. Unset slots are
+NaN, so a whole theme - or a stack of themes - can be converted or
+transformed with a handful of array operations instead of one Color at a
+time.
+
+float32 keeps ~7 significant digits, far finer than the 1/255 step DPG
+colors are quantized to, so to_dpg() gives the same values as
+Color.get_dpg_color(). to_theme() reproduces the original floats to float32
+precision; pass dtype=numpy.float64 to from_theme() to round-trip them bit
+for bit.
+'''
+import dataclasses
+import types
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from dpgtheminator.models import COLOR_GROUPS
+from dpgtheminator.models import Color
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+
+
+# Row order of each group's array
+SLOT_INDEX: typing.Mapping[str, tuple[str, ...]] = types.MappingProxyType({
+    group: tuple(slot.field for slot in colors_type.dpg_slots)
+    for group, colors_type in COLOR_GROUPS.items()
+})
+
+
+def _pack_colors(colors: typing.Iterable[Color | None], dtype: npt.DTypeLike) -> np.ndarray:
+    nan = float('nan')
+    return np.array(
+        [
+            (nan, nan, nan, nan) if color is None else (color.red, color.green, color.blue, color.alpha)
+            for color in colors
+        ],
+        dtype=dtype,
+    ).reshape(-1, 4)
+
+
+def _unpack_colors(array: np.ndarray) -> list[Color | None]:
+    return [
+        None if row[0] != row[0] else Color(*row)  # NaN != NaN
+        for row in array.tolist()
+    ]
+
+
+@dataclasses.dataclass
+class PackedTheme:
+    # Item type of each component, i.e. ThemeComponent.component
+    components: list[int]
+    # group -> (components, slots, 4)
+    colors: dict[str, np.ndarray]
+    # group -> (components,) bool, False where the group itself is None
+    present: dict[str, np.ndarray]
+    # One (colors, 4) array per colormap
+    colormaps: list[np.ndarray] = dataclasses.field(default_factory=list)
+    base: str | None = None
+
+    @classmethod
+    def from_theme(cls, theme: Theme, dtype: npt.DTypeLike = np.float32) -> 'PackedTheme':
+        colors = {}
+        present = {}
+        for group, fields in SLOT_INDEX.items():
+            group_colors = [getattr(component, group) for component in theme.components]
+            present[group] = np.array([colors is not None for colors in group_colors], dtype=bool)
+            colors[group] = _pack_colors(
+                (
+                    None if colors is None else getattr(colors, field)
+                    for colors in group_colors
+                    for field in fields
+                ),
+                dtype,
+            ).reshape(len(theme.components), len(fields), 4)
+        return cls(
+            [component.component for component in theme.components],
+            colors,
+            present,
+            [_pack_colors(colormap, dtype) for colormap in theme.colormaps],
+            theme.base,
+        )
+
+    def to_theme(self) -> Theme:
+        components = [ThemeComponent(component=item_type) for item_type in self.components]
+        for group, fields in SLOT_INDEX.items():
+            colors_type = COLOR_GROUPS[group]
+            for index, component in enumerate(components):
+                if not self.present[group][index]:
+                    continue
+                values = _unpack_colors(self.colors[group][index])
+                setattr(component, group, colors_type(**dict(zip(fields, values))))
+        colormaps = [tuple(_unpack_colors(colormap)) for colormap in self.colormaps]
+        return Theme(components, colormaps, self.base)  # type: ignore
+
+    def copy(self) -> 'PackedTheme':
+        return dataclasses.replace(
+            self,
+            components=list(self.components),
+            colors={group: array.copy() for group, array in self.colors.items()},
+            present={group: array.copy() for group, array in self.present.items()},
+            colormaps=[colormap.copy() for colormap in self.colormaps],
+        )
+
+    def mask(self, group: str) -> np.ndarray:
+        '''(components, slots) bool, True where the slot is set'''
+        return ~np.isnan(self.colors[group][..., 0])
+
+    def to_dpg(self) -> dict[str, np.ndarray]:
+        '''group -> (components, slots, 4) uint8 DPG colors; unset slots are 0'''
+        return {group: to_dpg(array) for group, array in self.colors.items()}
+
+    def iter_dpg_colors(self) -> typing.Iterator[tuple[int, str, str, tuple[int, int, int, int]]]:
+        '''(component index, group, field, DPG color) for every set slot'''
+        for group, array in self.to_dpg().items():
+            fields = SLOT_INDEX[group]
+            components, slots = np.nonzero(self.mask(group))
+            for index, slot, color in zip(components.tolist(), slots.tolist(), array[components, slots].tolist()):
+                yield index, group, fields[slot], tuple(color)
+
+
+def to_dpg(array: np.ndarray) -> np.ndarray:
+    '''Convert normalized colors (..., 4) to DPG's 0-255 uint8 in one pass.
+
+    Rounds half to even like Color.get_dpg_color; NaN (unset) becomes 0.
+    '''
+    scaled = np.nan_to_num(array.astype(np.float64, copy=False)) * 255
+    # float32 storage can nudge an exact .5 (e.g. 0.9 * 255) off the tie, so
+    # snap to well above float32 precision before rounding
+    scaled = np.rint(np.round(scaled, 4))
+    return np.clip(scaled, 0, 255).astype(np.uint8)
@@ -0,0 +1,178 @@
+'''Differences between themes, as small serializable patches.
+
+    patch = diff(theme_a, theme_b)
+    apply_patch(theme_a, patch)      # theme_a now matches theme_b
+    apply_patch(controller, patch)   # only the changed DPG items are touched
+    msgspec.json.encode(patch)       # store or ship it instead of a theme
+
+Every change records both its old and new value, so patch.inverted()
+undoes it. Patches that add, remove or retype components are structural:
+applied to a controller they rebuild its theme rather than updating items
+in place.
+
+Setting a whole colors group to None is recorded as setting each of its
+slots to None; once the last of them is applied the group is None again, so
+apply_patch(a, diff(a, b)) == b.
+'''
+import typing
+
+import msgspec
+
+from dpgtheminator.models import COLOR_GROUPS
+from dpgtheminator.models import Color
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+
+if typing.TYPE_CHECKING:
+    from dpgtheminator.controller import Controller
+
+
+class SlotChange(msgspec.Struct, array_like=True):
+    component: int
+    group: str
+    field: str
+    old: Color | None
+    new: Color | None
+
+    def inverted(self) -> 'SlotChange':
+        return SlotChange(self.component, self.group, self.field, self.new, self.old)
+
+
+class ComponentChange(msgspec.Struct, array_like=True):
+    '''A component's item type; None for a component that doesn't exist'''
+    index: int
+    old: int | None
+    new: int | None
+
+    def inverted(self) -> 'ComponentChange':
+        return ComponentChange(self.index, self.new, self.old)
+
+
+class ColormapChange(msgspec.Struct, array_like=True):
+    '''A whole colormap; None for a colormap that doesn't exist'''
+    index: int
+    old: tuple[Color, ...] | None
+    new: tuple[Color, ...] | None
+
+    def inverted(self) -> 'ColormapChange':
+        return ColormapChange(self.index, self.new, self.old)
+
+
+class Patch(msgspec.Struct, omit_defaults=True):
+    slots: list[SlotChange] = []
+    components: list[ComponentChange] = []
+    colormaps: list[ColormapChange] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.slots or self.components or self.colormaps)
+
+    @property
+    def structural(self) -> bool:
+        return bool(self.components)
+
+    def inverted(self) -> 'Patch':
+        return Patch(
+            [change.inverted() for change in self.slots],
+            [change.inverted() for change in self.components],
+            [change.inverted() for change in self.colormaps],
+        )
+
+
+def _diff_group(index: int, group: str, old, new, changes: list[SlotChange]):
+    if old == new:
+        return
+    # Compare field by field only for groups that differ at all
+    for field in COLOR_GROUPS[group].__struct_fields__:
+        old_color = None if old is None else getattr(old, field)
+        new_color = None if new is None else getattr(new, field)
+        if old_color != new_color:
+            changes.append(SlotChange(index, group, field, old_color, new_color))
+
+
+def diff(old: Theme, new: Theme) -> Patch:
+    '''The patch that turns old into new'''
+    patch = Patch()
+    empty = ThemeComponent()
+    for index in range(max(len(old.components), len(new.components))):
+        old_component = old.components[index] if index < len(old.components) else None
+        new_component = new.components[index] if index < len(new.components) else None
+        old_type = None if old_component is None else old_component.component
+        new_type = None if new_component is None else new_component.component
+        if old_type != new_type:
+            patch.components.append(ComponentChange(index, old_type, new_type))
+        if old_component == new_component:
+            continue
+        for group in COLOR_GROUPS:
+            _diff_group(
+                index,
+                group,
+                getattr(old_component or empty, group),
+                getattr(new_component or empty, group),
+                patch.slots,
+            )
+
+    for index in range(max(len(old.colormaps), len(new.colormaps))):
+        old_colormap = old.colormaps[index] if index < len(old.colormaps) else None
+        new_colormap = new.colormaps[index] if index < len(new.colormaps) else None
+        if old_colormap != new_colormap:
+            patch.colormaps.append(ColormapChange(index, old_colormap, new_colormap))
+    return patch
+
+
+def set_slot(theme: Theme, component_index: int, group: str, field: str, color: Color | None):
+    '''Set one slot, creating its group as needed and dropping it once empty'''
+    component = theme.components[component_index]
+    colors = getattr(component, group)
+    if colors is None:
+        if color is None:
+            return
+        colors = COLOR_GROUPS[group]()
+        setattr(component, group, colors)
+    setattr(colors, field, color)
+    if color is None and all(getattr(colors, name) is None for name in colors.__struct_fields__):
+        setattr(component, group, None)
+
+
+def _apply_to_theme(theme: Theme, patch: Patch) -> Theme:
+    added = [change for change in patch.components if change.new is not None]
+    if added:
+        needed = max(change.index for change in added) + 1
+        theme.components.extend(ThemeComponent() for _ in range(needed - len(theme.components)))
+        for change in added:
+            theme.components[change.index].component = change.new  # type: ignore
+    for slot in patch.slots:
+        set_slot(theme, slot.component, slot.group, slot.field, slot.new)
+    removed = [change.index for change in patch.components if change.new is None]
+    if removed:
+        del theme.components[min(removed):]
+    apply_colormap_changes(theme.colormaps, patch.colormaps)
+    return theme
+
+
+def apply_colormap_changes(colormaps: list[tuple[Color, ...]], changes: list[ColormapChange]):
+    # diff() only ever adds or removes colormaps at the end
+    for change in sorted(changes, key=lambda change: change.index):
+        if change.new is None:
+            continue
+        if change.index < len(colormaps):
+            colormaps[change.index] = change.new
+        else:
+            colormaps.append(change.new)
+    removed = [change.index for change in changes if change.new is None]
+    if removed:
+        del colormaps[min(removed):]
+
+
+@typing.overload
+def apply_patch(target: Theme, patch: Patch) -> Theme: ...
+@typing.overload
+def apply_patch(target: 'Controller', patch: Patch, queue: bool = False) -> 'Controller': ...
+def apply_patch(target: 'Theme | Controller', patch: Patch, queue: bool = False) -> 'Theme | Controller':
+    '''Apply patch to a Theme in place, or to a live Controller.
+
+    For a controller, queue=True goes through queue_color/queue_load, so it
+    is safe to call from any thread.
+    '''
+    if isinstance(target, Theme):
+        return _apply_to_theme(target, patch)
+    return target.apply_patch(patch, queue)
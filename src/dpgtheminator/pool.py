@@ -0,0 +1,132 @@
+'''Shared DPG themes for theming many items with a few variants.
+
+    pool = ThemePool()
+    warning = ThemeComponent(core_colors=CoreColors(button=Color(0.9, 0.6, 0.1)))
+    pool.bind_many(warning_rows, warning)
+    pool.bind_many(error_rows, error)
+
+Themes are deduplicated by content (theme_key), so every equal theme or
+component, however many times it is passed in, shares one set of DPG
+items. Each compiled theme is reference counted by the items bound to it;
+ones no item uses any more are kept in a small LRU in case they come back,
+then released.
+
+Pooled themes are never edited in place - bind a changed theme and its
+items move to the matching compiled theme.
+
+Items deleted from DPG still hold their reference until prune() forgets
+them. bind_many() prunes by itself whenever the number of bound items has
+doubled since the last prune, so rebuilding a table with new item ids
+doesn't pile up dead bindings.
+'''
+from collections.abc import Iterable
+import collections
+import dataclasses
+import typing
+
+from dpgtheminator.backends import Backend
+from dpgtheminator.backends import default_backend
+from dpgtheminator.compiled import CompiledTheme
+from dpgtheminator.compiled import ThemeCache
+from dpgtheminator.compiled import theme_key
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+from dpgtheminator.util import item_id
+
+if typing.TYPE_CHECKING:
+    from dpgcontainers.base import DPGContainersBase
+
+
+@dataclasses.dataclass
+class ThemePool:
+    backend: Backend = dataclasses.field(default_factory=default_backend, repr=False)
+    # Compiled themes bound to at least one item
+    entries: dict[bytes, CompiledTheme] = dataclasses.field(default_factory=dict)
+    refcounts: collections.Counter[bytes] = dataclasses.field(default_factory=collections.Counter)
+    # item -> key of the theme it is bound to
+    bindings: dict[int|str, bytes] = dataclasses.field(default_factory=dict)
+    unused: ThemeCache = dataclasses.field(default_factory=ThemeCache)
+    # Bound items left by the last prune(); bind_many prunes again at twice that
+    pruned_size: int = 0
+    min_prune_size: int = 1024
+
+    def _acquire(self, theme: Theme | ThemeComponent) -> tuple[bytes, CompiledTheme]:
+        if isinstance(theme, ThemeComponent):
+            theme = Theme([theme])
+        key = theme_key(theme)
+        compiled = self.entries.get(key)
+        if compiled is None:
+            compiled = self.unused.pop(key)
+            if compiled is None:
+                compiled = CompiledTheme.build(self.backend, theme, key)
+            self.entries[key] = compiled
+        return key, compiled
+
+    def _drop(self, key: bytes, count: int):
+        self.refcounts[key] -= count
+        if self.refcounts[key] <= 0:
+            del self.refcounts[key]
+            self.unused.put(key, self.entries.pop(key))
+
+    def bind(self, target: 'int|str|DPGContainersBase', theme: Theme | ThemeComponent) -> int:
+        return self.bind_many([target], theme)
+
+    def bind_many(self, targets: Iterable['int|str|DPGContainersBase'], theme: Theme | ThemeComponent) -> int:
+        '''Bind the shared DPG theme for theme to every target, returning its id'''
+        key, compiled = self._acquire(theme)
+        items = [item_id(target) for target in targets]
+        released: collections.Counter[bytes] = collections.Counter()
+        added = 0
+        for item in items:
+            previous = self.bindings.get(item)
+            if previous == key:
+                continue
+            if previous is not None:
+                released[previous] += 1
+            self.bindings[item] = key
+            added += 1
+        self.refcounts[key] += added
+        self.backend.bind_item_themes(items, compiled.dpg_theme)
+        for previous, count in released.items():
+            self._drop(previous, count)
+        if not self.refcounts[key]:
+            # Every target was already unbound from it, e.g. an empty list
+            del self.refcounts[key]
+            self.unused.put(key, self.entries.pop(key))
+        if len(self.bindings) >= 2 * max(self.pruned_size, self.min_prune_size // 2):
+            self.prune()
+        return compiled.dpg_theme
+
+    def unbind_many(self, targets: Iterable['int|str|DPGContainersBase']):
+        '''Remove the pooled theme from every target'''
+        items = [item for item in dict.fromkeys(map(item_id, targets)) if item in self.bindings]
+        released: collections.Counter[bytes] = collections.Counter(self.bindings.pop(item) for item in items)
+        self.backend.bind_item_themes(items, 0)
+        for key, count in released.items():
+            self._drop(key, count)
+
+    def prune(self):
+        '''Forget items that no longer exist, releasing themes only they used'''
+        dead = [item for item in self.bindings if not self.backend.does_item_exist(item)]
+        released: collections.Counter[bytes] = collections.Counter(self.bindings.pop(item) for item in dead)
+        for key, count in released.items():
+            self._drop(key, count)
+        self.pruned_size = len(self.bindings)
+
+    def release(self):
+        '''Delete every DPG item the pool created; bound items lose their theme'''
+        for compiled in self.entries.values():
+            compiled.release()
+        self.entries.clear()
+        self.refcounts.clear()
+        self.bindings.clear()
+        self.unused.clear()
+        self.pruned_size = 0
+
+    def __len__(self) -> int:
+        '''Number of distinct themes in use'''
+        return len(self.entries)
+
+    @property
+    def item_count(self) -> int:
+        return sum(compiled.item_count for compiled in self.entries.values()) + self.unused.item_count
@@ -0,0 +1,155 @@
+'''Known themes and palettes, decoded ahead of time.
+
+A ThemeRegistry discovers the bundled default themes and palettes plus
+every *.json theme in the given user directories, then decodes them all on
+a background thread pool:
+
+    registry = ThemeRegistry([pathlib.Path('~/themes').expanduser()]).preload()
+    controller = Controller(registry=registry)
+    controller.load('catppuccin_mocha')  # no disk read or decode
+
+Discovery only lists names, so menus can be built straight away; asking
+for a theme that is still decoding waits for just that one. User themes
+override bundled themes of the same name.
+'''
+import concurrent.futures
+import dataclasses
+import importlib.resources
+import pathlib
+import threading
+
+import msgspec
+
+import dpgtheminator
+from dpgtheminator.bundle import default_bundle
+from dpgtheminator.models import Palette
+from dpgtheminator.models import Theme
+from dpgtheminator.util import copy_theme
+
+
+_theme_decoder = msgspec.json.Decoder(Theme)
+_palette_decoder = msgspec.json.Decoder(Palette)
+
+
+def _resource_names(directory: str) -> list[str]:
+    resources = importlib.resources.files(dpgtheminator) / directory
+    return sorted(resource.name.removesuffix('.json') for resource in resources.iterdir() if resource.name.endswith('.json'))
+
+
+def _read_resource(path: str) -> bytes:
+    return (importlib.resources.files(dpgtheminator) / path).read_bytes()
+
+
+def _label(name: str) -> str:
+    return name.replace('_', ' ').title()
+
+
+@dataclasses.dataclass
+class RegistryEntry:
+    name: str
+    label: str
+    # The file a user theme came from; None for bundled themes and palettes
+    path: pathlib.Path | None = None
+
+    @property
+    def is_default(self) -> bool:
+        return self.path is None
+
+
+@dataclasses.dataclass
+class ThemeRegistry:
+    user_dirs: list[pathlib.Path] = dataclasses.field(default_factory=list)
+    include_defaults: bool = True
+    max_workers: int | None = None
+    themes: dict[str, RegistryEntry] = dataclasses.field(default_factory=dict, init=False)
+    palettes: dict[str, RegistryEntry] = dataclasses.field(default_factory=dict, init=False)
+    _theme_futures: dict[str, concurrent.futures.Future[Theme]] = dataclasses.field(default_factory=dict, init=False, repr=False)
+    _palette_futures: dict[str, concurrent.futures.Future[Palette]] = dataclasses.field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = dataclasses.field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self):
+        self.user_dirs = [pathlib.Path(directory) for directory in self.user_dirs]
+        self.discover()
+
+    def discover(self):
+        '''Find every theme and palette name, without decoding anything'''
+        themes: dict[str, RegistryEntry] = {}
+        palettes: dict[str, RegistryEntry] = {}
+        if self.include_defaults:
+            defaults = default_bundle()
+            theme_names = defaults.theme_names if defaults is not None else _resource_names('default_themes')
+            palette_names = defaults.palette_names if defaults is not None else _resource_names('default_palettes')
+            themes.update((name, RegistryEntry(name, _label(name))) for name in theme_names)
+            palettes.update((name, RegistryEntry(name, _label(name))) for name in palette_names)
+        for directory in self.user_dirs:
+            for path in sorted(directory.glob('*.json')):
+                name = path.name.removesuffix('.json')
+                themes[name] = RegistryEntry(name, _label(name), path)
+        with self._lock:
+            self.themes = themes
+            self.palettes = palettes
+            self._theme_futures = {}
+            self._palette_futures = {}
+        return self
+
+    def preload(self):
+        '''Start decoding everything not yet decoded on a background pool'''
+        executor = concurrent.futures.ThreadPoolExecutor(self.max_workers, thread_name_prefix='dpgtheminator-registry')
+        with self._lock:
+            for name, entry in self.themes.items():
+                if name not in self._theme_futures:
+                    self._theme_futures[name] = executor.submit(self._decode_theme, entry)
+            for name, entry in self.palettes.items():
+                if name not in self._palette_futures:
+                    self._palette_futures[name] = executor.submit(self._decode_palette, entry)
+        # Submitted work still runs; the workers exit once it is done
+        executor.shutdown(wait=False)
+        return self
+
+    @staticmethod
+    def _decode_theme(entry: RegistryEntry) -> Theme:
+        if entry.path is not None:
+            return _theme_decoder.decode(entry.path.read_bytes())
+        defaults = default_bundle()
+        if defaults is not None and entry.name in defaults.index.themes:
+            return defaults.theme(entry.name)
+        return _theme_decoder.decode(_read_resource(f'default_themes/{entry.name}.json'))
+
+    @staticmethod
+    def _decode_palette(entry: RegistryEntry) -> Palette:
+        defaults = default_bundle()
+        if defaults is not None and entry.name in defaults.index.palettes:
+            return defaults.palette(entry.name)
+        return _palette_decoder.decode(_read_resource(f'default_palettes/{entry.name}.json'))
+
+    def _future[T](self, futures: dict[str, concurrent.futures.Future[T]], entries: dict[str, RegistryEntry], name: str, decode) -> concurrent.futures.Future[T]:
+        with self._lock:
+            future = futures.get(name)
+            if future is None:
+                # Not preloaded; decode it here and now
+                entry = entries[name]
+                future = concurrent.futures.Future()
+                try:
+                    future.set_result(decode(entry))
+                except Exception as error:
+                    future.set_exception(error)
+                futures[name] = future
+        return future
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.themes
+
+    def is_ready(self, name: str) -> bool:
+        future = self._theme_futures.get(name)
+        return future is not None and future.done()
+
+    def theme(self, name: str) -> Theme:
+        '''A private copy of the named theme, safe for a Controller to edit.
+
+        Raises KeyError for unknown names, and re-raises any error decoding
+        the theme file.
+        '''
+        return copy_theme(self._future(self._theme_futures, self.themes, name, self._decode_theme).result())
+
+    def palette(self, name: str) -> Palette:
+        return self._future(self._palette_futures, self.palettes, name, self._decode_palette).result()
@@ -0,0 +1,84 @@
+'''Snap theme colors to the perceptually nearest palette entry, requires numpy.
+
+    house_theme = snap.snap_to_palette(theme, palette)
+
+Distances are Euclidean in OKLab by default, or CIEDE2000 with
+metric='ciede2000'. Lookups are a vectorized distance matrix between colors
+and palette, computed in chunks to bound memory. Slots keep their own alpha
+unless keep_alpha is False.
+'''
+from collections.abc import Sequence
+import typing
+
+import numpy as np
+
+from dpgtheminator import colorspace
+from dpgtheminator import transforms
+from dpgtheminator.models import Palette
+from dpgtheminator.models import Theme
+
+
+Metric = typing.Literal['oklab', 'ciede2000']
+
+# Colors per distance matrix chunk
+CHUNK_SIZE = 4096
+
+
+def _palette_array(palette: Palette) -> np.ndarray:
+    return np.array([(color.red, color.green, color.blue, color.alpha) for color in palette.colors], dtype=np.float64)
+
+
+def nearest_indices(srgb: np.ndarray, palette_srgb: np.ndarray, metric: Metric = 'oklab') -> np.ndarray:
+    '''Index of the nearest palette_srgb entry for each (n, 3) sRGB color'''
+    if metric == 'oklab':
+        colors = colorspace.srgb_to_oklab(srgb)
+        candidates = colorspace.srgb_to_oklab(palette_srgb)
+
+        def distances(chunk: np.ndarray) -> np.ndarray:
+            return np.sum((chunk[:, None, :] - candidates[None, :, :]) ** 2, axis=-1)
+    elif metric == 'ciede2000':
+        colors = colorspace.srgb_to_lab(srgb)
+        candidates = colorspace.srgb_to_lab(palette_srgb)
+
+        def distances(chunk: np.ndarray) -> np.ndarray:
+            return colorspace.ciede2000(chunk[:, None, :], candidates[None, :, :])
+    else:
+        raise ValueError(f'Unknown metric {metric!r}')
+
+    indices = np.empty(len(colors), dtype=np.intp)
+    for start in range(0, len(colors), CHUNK_SIZE):
+        chunk = colors[start:start + CHUNK_SIZE]
+        indices[start:start + CHUNK_SIZE] = np.argmin(distances(chunk), axis=1)
+    return indices
+
+
+def snap(palette: Palette, metric: Metric = 'oklab', keep_alpha: bool = True) -> transforms.Operation:
+    '''A transforms operation replacing each color with its nearest palette color'''
+    if not palette.colors:
+        raise ValueError('Cannot snap to an empty palette')
+    palette_colors = _palette_array(palette)
+
+    def _snap(colors: np.ndarray) -> np.ndarray:
+        result = colors.copy()
+        set_rows = ~np.isnan(colors[:, 0])
+        nearest = palette_colors[nearest_indices(colors[set_rows, :3], palette_colors[:, :3], metric)]
+        if keep_alpha:
+            result[set_rows, :3] = nearest[:, :3]
+        else:
+            result[set_rows] = nearest
+        return result
+    return _snap
+
+
+@typing.overload
+def snap_to_palette(themes: Theme, palette: Palette, metric: Metric = 'oklab', keep_alpha: bool = True) -> Theme: ...
+@typing.overload
+def snap_to_palette(themes: Sequence[Theme], palette: Palette, metric: Metric = 'oklab', keep_alpha: bool = True) -> list[Theme]: ...
+def snap_to_palette(
+    themes: Theme | Sequence[Theme],
+    palette: Palette,
+    metric: Metric = 'oklab',
+    keep_alpha: bool = True,
+) -> Theme | list[Theme]:
+    '''Replace every color, colormaps included, with its nearest palette color'''
+    return transforms.apply(themes, snap(palette, metric, keep_alpha))
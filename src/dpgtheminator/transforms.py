@@ -0,0 +1,141 @@
+'''Bulk color transforms over whole themes, requires numpy.
+
+Operations are functions over an (n, 4) array of sRGB + alpha colors in
+the 0-1 range. apply() packs every color of one or many themes into a
+single array, runs the operations over it, and unpacks new Theme objects
+that Controller.load accepts directly:
+
+    from dpgtheminator import transforms
+
+    disabled = transforms.apply(theme, transforms.desaturate(0.8), transforms.alpha(0.6))
+    variants = transforms.apply(themes, transforms.hue_rotate(30))
+
+Unset slots stay unset. Results are clipped to the sRGB gamut.
+'''
+from collections.abc import Callable
+from collections.abc import Iterable
+import math
+import typing
+
+import numpy as np
+
+from dpgtheminator import colorspace
+from dpgtheminator.models import Theme
+from dpgtheminator.packed import PackedTheme
+from dpgtheminator.packed import SLOT_INDEX
+
+
+Operation = Callable[[np.ndarray], np.ndarray]
+
+
+@typing.overload
+def apply(themes: Theme, *operations: Operation, colormaps: bool = True) -> Theme: ...
+@typing.overload
+def apply(themes: Iterable[Theme], *operations: Operation, colormaps: bool = True) -> list[Theme]: ...
+def apply(themes: Theme | Iterable[Theme], *operations: Operation, colormaps: bool = True) -> Theme | list[Theme]:
+    '''Run operations, in order, over every color of themes in one pass'''
+    single = isinstance(themes, Theme)
+    packed = [PackedTheme.from_theme(theme, np.float64) for theme in ([themes] if single else themes)]  # type: ignore
+
+    arrays: list[np.ndarray] = []
+    for theme in packed:
+        arrays.extend(theme.colors[group].reshape(-1, 4) for group in SLOT_INDEX)
+        if colormaps:
+            arrays.extend(theme.colormaps)
+    if not arrays:
+        return packed[0].to_theme() if single else [theme.to_theme() for theme in packed]
+
+    colors = np.concatenate(arrays)
+    for operation in operations:
+        colors = operation(colors)
+    colors = np.clip(colors, 0.0, 1.0)
+
+    offset = 0
+    for theme in packed:
+        for group in SLOT_INDEX:
+            shape = theme.colors[group].shape
+            size = shape[0] * shape[1]
+            theme.colors[group] = colors[offset:offset + size].reshape(shape)
+            offset += size
+        if colormaps:
+            for index, colormap in enumerate(theme.colormaps):
+                theme.colormaps[index] = colors[offset:offset + len(colormap)]
+                offset += len(colormap)
+
+    results = [theme.to_theme() for theme in packed]
+    return results[0] if single else results
+
+
+def _map_rgb(colors: np.ndarray, function: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    result = colors.copy()
+    result[:, :3] = function(colors[:, :3])
+    return result
+
+
+def _map_oklab(colors: np.ndarray, function: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    return _map_rgb(colors, lambda rgb: colorspace.oklab_to_srgb(function(colorspace.srgb_to_oklab(rgb))))
+
+
+def brightness(factor: float) -> Operation:
+    '''Scale light intensity, in linear RGB'''
+    def _brightness(colors: np.ndarray) -> np.ndarray:
+        return _map_rgb(colors, lambda rgb: colorspace.linear_to_srgb(colorspace.srgb_to_linear(rgb) * factor))
+    return _brightness
+
+
+def lightness(delta: float) -> Operation:
+    '''Shift perceptual lightness, OKLab L, by delta (L runs 0-1)'''
+    def _lightness(colors: np.ndarray) -> np.ndarray:
+        def shift(lab: np.ndarray) -> np.ndarray:
+            lab[:, 0] += delta
+            return lab
+        return _map_oklab(colors, shift)
+    return _lightness
+
+
+def contrast(factor: float, pivot: float = 0.5) -> Operation:
+    '''Stretch (factor > 1) or compress OKLab lightness around pivot'''
+    def _contrast(colors: np.ndarray) -> np.ndarray:
+        def stretch(lab: np.ndarray) -> np.ndarray:
+            lab[:, 0] = (lab[:, 0] - pivot) * factor + pivot
+            return lab
+        return _map_oklab(colors, stretch)
+    return _contrast
+
+
+def hue_rotate(degrees: float) -> Operation:
+    '''Rotate hue in OKLab, keeping lightness and chroma'''
+    cos = math.cos(math.radians(degrees))
+    sin = math.sin(math.radians(degrees))
+    rotation = np.array([[cos, sin], [-sin, cos]])
+
+    def _hue_rotate(colors: np.ndarray) -> np.ndarray:
+        def rotate(lab: np.ndarray) -> np.ndarray:
+            lab[:, 1:] = lab[:, 1:] @ rotation
+            return lab
+        return _map_oklab(colors, rotate)
+    return _hue_rotate
+
+
+def saturation(factor: float) -> Operation:
+    '''Scale OKLab chroma; 0 is fully grey, 1 is unchanged'''
+    def _saturation(colors: np.ndarray) -> np.ndarray:
+        def scale(lab: np.ndarray) -> np.ndarray:
+            lab[:, 1:] *= factor
+            return lab
+        return _map_oklab(colors, scale)
+    return _saturation
+
+
+def desaturate(amount: float = 1.0) -> Operation:
+    '''Move colors towards grey by amount (0-1), e.g. for a "disabled" look'''
+    return saturation(1.0 - amount)
+
+
+def alpha(factor: float) -> Operation:
+    '''Scale alpha'''
+    def _alpha(colors: np.ndarray) -> np.ndarray:
+        result = colors.copy()
+        result[:, 3] *= factor
+        return result
+    return _alpha
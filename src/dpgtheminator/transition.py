@@ -0,0 +1,173 @@
+'''Animated crossfades between themes, requires numpy.
+
+    controller.transition_to(dark_theme, duration=0.3)
+
+Every frame's colors are computed up front, as one uint8 array per colors
+group, by interpolating all slots at once in OKLab. Each rendered frame
+then only calls set_value on the ThemeColor items whose value actually
+changes from the frame before - nothing is created, deleted or rebound.
+
+Slots set in only one of the two themes, and colormaps, switch at the start
+(slots gained) or the end (slots lost, colormaps) rather than fading. Themes
+with different components can't share items, so transition_to just loads
+those.
+'''
+import time
+import typing
+
+import numpy as np
+
+from dpgtheminator import colorspace
+from dpgtheminator.models import Theme
+from dpgtheminator.packed import PackedTheme
+from dpgtheminator.packed import SLOT_INDEX
+from dpgtheminator.packed import to_dpg
+from dpgtheminator.patch import diff
+from dpgtheminator.patch import set_slot
+
+if typing.TYPE_CHECKING:
+    from dpgtheminator.compiled import CompiledTheme
+    from dpgtheminator.controller import Controller
+
+
+def _smoothstep(t: np.ndarray) -> np.ndarray:
+    return t * t * (3 - 2 * t)
+
+
+def interpolate(start: np.ndarray, end: np.ndarray, steps: int) -> np.ndarray:
+    '''(steps, ..., 4) colors easing from start to end, in OKLab'''
+    t = _smoothstep(np.linspace(0.0, 1.0, steps + 1)[1:])
+    shape = (steps,) + (1,) * start.ndim
+    t = t.reshape(shape)
+    start_lab = colorspace.srgb_to_oklab(start[..., :3])
+    end_lab = colorspace.srgb_to_oklab(end[..., :3])
+    frames = np.empty((steps,) + start.shape)
+    frames[..., :3] = colorspace.oklab_to_srgb(start_lab + (end_lab - start_lab) * t)
+    frames[..., 3] = start[..., 3] + (end[..., 3] - start[..., 3]) * t[..., 0]
+    return frames
+
+
+class ThemeTransition:
+    '''A precomputed crossfade of a controller's live theme towards target.
+
+    Driven by frame callbacks once start()ed, or by calling advance()
+    directly, e.g. from a render loop or a test.
+    '''
+    def __init__(self, controller: 'Controller', target: Theme, name: str, duration: float = 0.3, fps: int = 60):
+        assert controller.theme is not None and controller.compiled is not None
+        self.controller = controller
+        self.compiled: CompiledTheme = controller.compiled
+        self.target = target
+        self.name = name
+        self.duration = duration
+        self.steps = max(1, round(duration * fps))
+        self.done = False
+        self.started_at: float | None = None
+        self.frame = -1
+
+        start = PackedTheme.from_theme(controller.theme, np.float64)
+        end = PackedTheme.from_theme(target, np.float64)
+        # Per group: the live items to update, and their DPG values per frame
+        self.items: dict[str, np.ndarray] = {}
+        self.frames: dict[str, np.ndarray] = {}
+        self.start_values: dict[str, np.ndarray] = {}
+        self.previous: dict[str, np.ndarray] = {}
+        for group, fields in SLOT_INDEX.items():
+            both = start.mask(group) & end.mask(group)
+            components, slots = np.nonzero(both)
+            if not len(components):
+                continue
+            self.items[group] = np.array([
+                self.compiled.colors[(component, group, fields[slot])]
+                for component, slot in zip(components.tolist(), slots.tolist())
+            ])
+            start_colors = start.colors[group][components, slots]
+            end_colors = end.colors[group][components, slots]
+            self.frames[group] = to_dpg(interpolate(start_colors, end_colors, self.steps))
+            self.start_values[group] = to_dpg(start_colors)
+            self.previous[group] = self.start_values[group]
+
+    def start(self):
+        '''Apply slots the target gains, then step on every rendered frame'''
+        assert self.controller.theme is not None
+        gained = diff(self.controller.theme, self.target)
+        gained.slots = [change for change in gained.slots if change.old is None]
+        gained.colormaps = []
+        self.controller.apply_patch(gained)
+        self.started_at = time.monotonic()
+        self._schedule()
+        return self
+
+    def _schedule(self):
+        backend = self.controller.backend
+        backend.set_frame_callback(backend.get_frame_count() + 1, self._frame_callback)
+
+    def _frame_callback(self, sender, app_data, user_data):
+        if not self.done and not self.advance():
+            self._schedule()
+
+    def advance(self, frame: int | None = None) -> bool:
+        '''Show frame, by default the one due now; True once finished'''
+        if self.done:
+            return True
+        if self.controller.compiled is not self.compiled:
+            # Something else loaded a theme meanwhile
+            self.done = True
+            return True
+        if frame is None:
+            if self.started_at is None:
+                self.started_at = time.monotonic()
+            elapsed = time.monotonic() - self.started_at
+            frame = self.steps - 1 if self.duration <= 0 else int(elapsed / self.duration * self.steps)
+        frame = min(frame, self.steps - 1)
+        if frame > self.frame:
+            self._show(frame)
+            self.frame = frame
+        if frame == self.steps - 1:
+            self.finish()
+        return self.done
+
+    def _show(self, frame: int):
+        self._set_values({group: frames[frame] for group, frames in self.frames.items()})
+
+    def _set_values(self, values_by_group: dict[str, np.ndarray]):
+        set_value = self.controller.backend.set_value
+        for group, values in values_by_group.items():
+            changed = np.nonzero(np.any(values != self.previous[group], axis=-1))[0]
+            for item, value in zip(self.items[group][changed].tolist(), values[changed].tolist()):
+                set_value(item, tuple(value))
+            self.previous[group] = values
+
+    def cancel(self):
+        '''Stop, putting the items back to the controller's Theme as it was.
+
+        The items then match the Theme again, so the controller can cache
+        them under its hash.
+        '''
+        if self.done:
+            return
+        self.done = True
+        if self.controller.compiled is self.compiled:
+            self._set_values(self.start_values)
+
+    def finish(self):
+        '''Jump to the target, bringing the controller's Theme up to date'''
+        if self.done:
+            return
+        self.done = True
+        controller = self.controller
+        if controller.compiled is not self.compiled or controller.theme is None:
+            return
+        patch = diff(controller.theme, self.target)
+        # Items for slots set in both themes already show the target colors,
+        # so only the Theme needs them
+        for change in patch.slots:
+            if change.old is not None and change.new is not None:
+                set_slot(controller.theme, change.component, change.group, change.field, change.new)
+        self.compiled.key = None
+        patch.slots = [change for change in patch.slots if change.old is None or change.new is None]
+        controller.apply_patch(patch)
+        controller.theme.base = self.target.base
+        controller.name = self.name
+        if controller.transition is self:
+            controller.transition = None
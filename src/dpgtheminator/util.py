@@ -1,4 +1,7 @@
 import pathlib
+import typing
+
+import msgspec
 
 from dpgtheminator.models import Color
 from dpgtheminator.models import CoreColors
@@ -7,6 +10,9 @@ from dpgtheminator.models import PlotColors
 from dpgtheminator.models import Theme
 from dpgtheminator.models import ThemeComponent
 
+if typing.TYPE_CHECKING:
+    from dpgcontainers.base import DPGContainersBase
+
 
 def project_root() -> pathlib.Path:
     path = pathlib.Path(__file__).parent.parent.parent
@@ -27,3 +33,15 @@ def blank_theme():
     return theme
 
 
+_copy_encoder = msgspec.msgpack.Encoder()
+_copy_decoder = msgspec.msgpack.Decoder(Theme)
+
+
+def copy_theme(theme: Theme) -> Theme:
+    '''A deep copy; a msgpack round trip is ~10x faster than copy.deepcopy'''
+    return _copy_decoder.decode(_copy_encoder.encode(theme))
+
+
+def item_id(target: 'int|str|DPGContainersBase') -> int|str:
+    '''The dearpygui id or tag of target, unwrapping dpgcontainers objects'''
+    return getattr(target, 'id_', target)  # type: ignore
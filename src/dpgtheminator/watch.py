@@ -0,0 +1,125 @@
+'''Apply outside edits of a theme file to a live controller.
+
+    watcher = controller.load(pathlib.Path('my_theme.json')).bind().watch()
+    ...
+    watcher.stop()
+
+A daemon thread polls the file's modification time and size. When they
+change, the file is decoded and compared with the version seen before:
+the resulting patch.Patch is queued on the controller, so only the changed
+slots' DPG items are updated, on the next frame. Structural changes -
+added, removed or retyped components - queue a full reload instead.
+A file that fails to decode, e.g. while an editor is half way through
+writing it, is skipped until it changes again.
+
+A watcher only applies edits while path is the controller's theme_path.
+The one started by Controller.watch() follows the controller: loading
+another file points it there, and loading a default theme stops it.
+'''
+import os
+import pathlib
+import threading
+import typing
+
+import msgspec
+
+from dpgtheminator.models import Theme
+from dpgtheminator.patch import diff
+
+if typing.TYPE_CHECKING:
+    from dpgtheminator.controller import Controller
+
+
+_decoder = msgspec.json.Decoder(Theme)
+
+
+class ThemeWatcher:
+    def __init__(self, controller: 'Controller', path: pathlib.Path, interval: float = 0.25):
+        self.controller = controller
+        self.path = pathlib.Path(path)
+        self.interval = interval
+        self.thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._snapshot()
+
+    def _snapshot(self):
+        # What the file holds now, which later edits are compared against
+        self._stamp = self._read_stamp()
+        content = self._read()
+        self._theme = None if content is None else self._decode(content)
+
+    def _read_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> bytes | None:
+        try:
+            return self.path.read_bytes()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _decode(content: bytes) -> Theme | None:
+        try:
+            return _decoder.decode(content)
+        except msgspec.DecodeError:
+            return None
+
+    def check(self) -> bool:
+        '''Poll once, queueing any changes; True if the file changed'''
+        if self.controller.is_default_theme or self.controller.theme_path != self.path:
+            # The controller has moved on to another theme
+            return False
+        stamp = self._read_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        content = self._read()
+        if content is None:
+            return False
+        theme = self._decode(content)
+        if theme is None:
+            return False
+
+        previous = self._theme
+        self._theme = theme
+        if previous is None:
+            # Decode again so the controller doesn't share structs with our
+            # copy, which the next diff compares against
+            self.controller.queue_load(_decoder.decode(content), self.path.name)
+        else:
+            patch = diff(previous, theme)
+            if patch:
+                self.controller.apply_patch(patch, queue=True)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self._stop.clear()
+            self.thread = threading.Thread(target=self._run, name=f'dpgtheminator-watch-{self.path.name}', daemon=True)
+            self.thread.start()
+        return self
+
+    def follow(self, path: pathlib.Path):
+        '''Watch path instead, from what it holds now'''
+        running = self.thread is not None
+        self.stop()
+        self.path = pathlib.Path(path)
+        self._snapshot()
+        if running:
+            self.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+        return self
@@ -0,0 +1,101 @@
+import sys
+
+import msgspec
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from dpgtheminator import audit
+from dpgtheminator import console
+from dpgtheminator.models import Color
+from dpgtheminator.models import CoreColors
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+
+
+BLACK = Color(0.0, 0.0, 0.0)
+WHITE = Color(1.0, 1.0, 1.0)
+GREY = Color(0x77 / 255, 0x77 / 255, 0x77 / 255)
+TEXT_ON_WINDOW = [audit.ContrastPair('core_colors.text', 'core_colors.window_bg')]
+
+
+def theme(text: Color, window_bg: Color | None = WHITE, **colors: Color) -> Theme:
+    return Theme([ThemeComponent(core_colors=CoreColors(text=text, window_bg=window_bg, **colors))])
+
+
+@pytest.mark.parametrize('text,expected', [(BLACK, 21.0), (WHITE, 1.0), (GREY, 4.48)])
+def test_contrast_ratio(text, expected):
+    ratios, owners = audit.contrast_ratios([theme(text)], TEXT_ON_WINDOW)
+    assert ratios[0, 0] == pytest.approx(expected, abs=0.01)
+    assert owners.tolist() == [0]
+
+
+def test_translucent_foreground_is_composited():
+    ratios, _ = audit.contrast_ratios([theme(Color(0.0, 0.0, 0.0, 0.0))], TEXT_ON_WINDOW)
+    assert ratios[0, 0] == pytest.approx(1.0)
+
+
+def test_translucent_background_is_composited_over_backdrop():
+    pairs = [audit.ContrastPair('core_colors.text', 'core_colors.button')]
+    clear_button = theme(WHITE, window_bg=BLACK, button=Color(1.0, 1.0, 1.0, 0.0))
+    ratios, _ = audit.contrast_ratios([clear_button], pairs)
+    assert ratios[0, 0] == pytest.approx(21.0)
+
+
+def test_unset_slots_are_skipped():
+    pairs = [audit.ContrastPair('core_colors.text', 'core_colors.button')]
+    ratios, _ = audit.contrast_ratios([theme(BLACK)], pairs)
+    assert np.isnan(ratios[0, 0])
+    assert audit.audit(theme(BLACK), pairs) == []
+
+
+def test_failures_name_theme_and_component():
+    two_components = Theme([
+        ThemeComponent(core_colors=CoreColors(text=BLACK, window_bg=WHITE)),
+        ThemeComponent(core_colors=CoreColors(text=GREY, window_bg=WHITE), component=5),
+    ])
+    failures = audit.audit([theme(BLACK), two_components, theme(WHITE)], TEXT_ON_WINDOW, names=['a', 'b', 'c'])
+    assert [(failure.theme, failure.component, failure.ratio) for failure in failures] == [
+        ('b', 1, 4.48),
+        ('c', 0, 1.0),
+    ]
+    assert failures[0].minimum == audit.WCAG_AA
+
+
+def test_minimums():
+    assert audit.audit(theme(GREY), [audit.ContrastPair('core_colors.text', 'core_colors.window_bg', 3.0)]) == []
+    assert len(audit.audit(theme(BLACK), TEXT_ON_WINDOW, minimum=22.0)) == 1
+
+
+def test_unknown_slot():
+    with pytest.raises(ValueError):
+        audit.audit(theme(BLACK), [audit.ContrastPair('core_colors.text', 'core_colors.nope')])
+
+
+def test_no_themes():
+    assert audit.audit([], TEXT_ON_WINDOW) == []
+
+
+def test_cli(tmp_path, capsys):
+    (tmp_path / 'good.json').write_bytes(msgspec.json.encode(theme(BLACK)))
+    (tmp_path / 'bad.json').write_bytes(msgspec.json.encode(theme(GREY)))
+    assert audit.main([str(tmp_path / 'good.json')]) == 0
+    assert audit.main([str(tmp_path)]) == 1
+    assert 'bad.json [0] core_colors.text on core_colors.window_bg: 4.48 < 4.50' in capsys.readouterr().out
+    assert audit.main([str(tmp_path), '--pair', 'core_colors.text:core_colors.window_bg:3']) == 0
+    with pytest.raises(SystemExit):
+        audit.main([str(tmp_path), '--pair', 'core_colors.text'])
+    with pytest.raises(SystemExit):
+        audit.main([])
+
+
+def test_cli_defaults(capsys):
+    audit.main(['--defaults'])
+    assert capsys.readouterr().out.splitlines()[-1].startswith('7 themes')
+
+
+def test_console_script_without_numpy(monkeypatch, capsys):
+    monkeypatch.delitem(sys.modules, 'dpgtheminator.audit')
+    monkeypatch.setitem(sys.modules, 'numpy', None)
+    assert console.audit() == 1
+    assert 'dpgtheminator[numpy]' in capsys.readouterr().err
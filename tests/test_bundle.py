@@ -0,0 +1,63 @@
+import importlib.resources
+
+import msgspec
+import pytest
+
+import dpgtheminator
+from dpgtheminator import bundle
+from dpgtheminator.models import Palette
+from dpgtheminator.models import Theme
+
+
+SOURCES = importlib.resources.files(dpgtheminator)
+
+
+def sources[T](directory: str, type_: type[T]) -> dict[str, T]:
+    '''The JSON files the bundle is built from, as scripts/generate_bundle.py reads them'''
+    files = sorted(
+        (resource for resource in (SOURCES / directory).iterdir() if resource.name.endswith('.json')),
+        key=lambda resource: resource.name,
+    )
+    return {resource.name.removesuffix('.json'): msgspec.json.decode(resource.read_bytes(), type=type_) for resource in files}
+
+
+@pytest.fixture(scope='module')
+def defaults() -> bundle.Bundle:
+    defaults = bundle.default_bundle()
+    assert defaults is not None, f'{bundle.BUNDLE_RESOURCE} is missing or unreadable'
+    return defaults
+
+
+def test_bundle_is_in_sync_with_json(defaults):
+    '''Fails after editing default_themes/ or default_palettes/ without running scripts/generate_bundle.py'''
+    themes = sources('default_themes', Theme)
+    palettes = sources('default_palettes', Palette)
+    assert defaults.theme_names == list(themes)
+    assert defaults.palette_names == list(palettes)
+    for name, theme in themes.items():
+        assert defaults.theme(name) == theme, name
+    for name, palette in palettes.items():
+        assert defaults.palette(name) == palette, name
+    assert (SOURCES / bundle.BUNDLE_RESOURCE).read_bytes() == bundle.encode(themes, palettes)
+
+
+def test_round_trip():
+    themes = sources('default_themes', Theme)
+    palettes = sources('default_palettes', Palette)
+    decoded = bundle.Bundle(bundle.encode(themes, palettes))
+    assert {name: decoded.theme(name) for name in decoded.theme_names} == themes
+    assert {name: decoded.palette(name) for name in decoded.palette_names} == palettes
+    with pytest.raises(KeyError):
+        decoded.theme('missing')
+
+
+def test_open_memory_maps(tmp_path):
+    path = tmp_path / 'test.bundle'
+    path.write_bytes(bundle.encode({'empty': Theme()}, {}))
+    assert bundle.Bundle.open(path).theme('empty') == Theme()
+
+
+@pytest.mark.parametrize('content', [b'', b'DPGTB', b'NOTABUNDLE\x00\x00\x00\x00'])
+def test_invalid_bundle(content):
+    with pytest.raises(bundle.BundleError):
+        bundle.Bundle(content)
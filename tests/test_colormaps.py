@@ -0,0 +1,111 @@
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.colormaps import ColormapStore
+from dpgtheminator.colormaps import colormap_key
+from dpgtheminator.controller import Controller
+from dpgtheminator.models import Color
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+
+
+def colormap(value: float) -> tuple[Color, ...]:
+    return (Color(value, 0.0, 0.0), Color(0.0, value, 0.0))
+
+
+def test_equal_colormaps_share_one_item():
+    backend = RecordingBackend()
+    store = ColormapStore(backend)
+    assert store.item_count == 0
+    keys, items = store.acquire([colormap(0.5), colormap(0.5), colormap(0.25)])
+    assert items[0] == items[1] != items[2]
+    assert store.refcounts[keys[0]] == 2
+    assert len(store) == 2
+    # The two colormaps and their registry
+    assert store.item_count == backend.item_count == 3
+
+
+def test_keys_are_dpg_colors():
+    # Both round to the same 0-255 values
+    assert colormap_key(colormap(0.5)) == colormap_key(colormap(0.5001))
+    assert colormap_key(colormap(0.5)) != colormap_key(colormap(0.51))
+
+
+def test_released_colormaps_are_kept_for_reuse():
+    backend = RecordingBackend()
+    store = ColormapStore(backend)
+    keys, items = store.acquire([colormap(0.5)])
+    store.release(keys)
+    assert not store.refcounts
+    assert list(store.unused) == keys
+    created = backend.created_count
+    assert store.acquire([colormap(0.5)])[1] == items
+    assert backend.created_count == created
+    assert not store.unused
+
+
+def test_unused_colormaps_are_evicted_oldest_first():
+    backend = RecordingBackend()
+    store = ColormapStore(backend, keep=2)
+    acquired = [store.acquire([colormap(index / 10)]) for index in range(4)]
+    for keys, _ in acquired:
+        store.release(keys)
+    assert list(store.unused) == acquired[2][0] + acquired[3][0]
+    for _, items in acquired[:2]:
+        assert items[0] not in backend.items
+    for _, items in acquired[2:]:
+        assert items[0] in backend.items
+    assert len(store) == 2
+
+
+def test_release_unused_deletes_registry_once_empty():
+    backend = RecordingBackend()
+    store = ColormapStore(backend)
+    kept, _ = store.acquire([colormap(0.5)])
+    dropped, _ = store.acquire([colormap(0.25)])
+    store.release(dropped)
+    store.release_unused()
+    assert len(store) == 1
+    assert store.registry is not None
+    store.release(kept)
+    store.release_unused()
+    assert store.item_count == backend.item_count == 0
+    assert store.registry is None
+
+
+def test_controllers_share_colormaps():
+    backend = RecordingBackend()
+    mocha = Controller(backend=backend).load('catppuccin_mocha')
+    again = Controller(backend=backend).load('catppuccin_mocha')
+    assert mocha.dpg_colormaps == again.dpg_colormaps
+    assert backend.colormap_store.refcounts[mocha.compiled.colormap_keys[0]] == 2
+    mocha.release()
+    # Still used by the other controller
+    assert again.dpg_colormaps[0] in backend.items
+    again.release()
+    assert backend.item_count == 0
+
+
+def test_only_changed_colormaps_are_rebound():
+    backend = RecordingBackend()
+    shared = colormap(0.5)
+    first = Theme([ThemeComponent()], colormaps=[shared, colormap(0.25)])
+    second = Theme([ThemeComponent()], colormaps=[shared, colormap(0.75)])
+    controller = Controller(backend=backend).load(first, 'first')
+    for plot in range(10):
+        controller.bind_colormap(plot % 2, f'plot-{plot}')
+    bound = backend.calls['bind_colormap']
+    controller.load(second, 'second').rebind_colormaps()
+    # Only the five plots on the colormap that changed
+    assert backend.calls['bind_colormap'] == bound + 5
+    assert all(backend.item_colormaps[f'plot-{plot}'] == controller.dpg_colormaps[plot % 2] for plot in range(10))
+
+
+def test_targets_without_a_colormap_keep_theirs():
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load(Theme([ThemeComponent()], colormaps=[colormap(0.5), colormap(0.25)]), 'two')
+    controller.bind_colormap(1, 'plot')
+    item = backend.item_colormaps['plot']
+    controller.load(Theme([ThemeComponent()], colormaps=[colormap(0.5)]), 'one').rebind_colormaps()
+    assert backend.item_colormaps['plot'] == item
+    assert item in backend.items
+    controller.load(Theme([ThemeComponent()], colormaps=[colormap(0.5), colormap(0.75)]), 'other').rebind_colormaps()
+    assert backend.item_colormaps['plot'] == controller.dpg_colormaps[1]
@@ -0,0 +1,79 @@
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.controller import Controller
+
+import pytest
+
+
+THEMES = ['dark', 'light', 'catppuccin_mocha', 'catppuccin_latte']
+
+
+def counts(controller: Controller) -> tuple[int, int]:
+    return controller.item_count, controller.backend.item_count
+
+
+@pytest.mark.parametrize('name', THEMES)
+def test_reload_keeps_item_count(name):
+    controller = Controller(backend=RecordingBackend()).load(name).bind()
+    before = counts(controller)
+    for _ in range(5):
+        controller.reload().rebind().rebind_colormaps()
+    assert counts(controller) == before
+
+
+def test_switching_themes_keeps_item_count():
+    controller = Controller(backend=RecordingBackend()).load(THEMES[0]).bind()
+    for name in THEMES:
+        controller.load(name).rebind().rebind_colormaps()
+    # Every theme is compiled or cached now, so further rounds build nothing
+    after_first_round = counts(controller)
+    created = controller.backend.created_count
+    for _ in range(3):
+        for name in THEMES:
+            controller.load(name).rebind().rebind_colormaps()
+    assert counts(controller) == after_first_round
+    assert controller.backend.created_count == created
+
+
+def test_switching_themes_without_cache_keeps_item_count():
+    controller = Controller(backend=RecordingBackend()).load('catppuccin_mocha').bind()
+    controller.theme_cache.maxsize = 0
+    before = counts(controller)
+    for name in THEMES * 3:
+        controller.load(name)
+    controller.load('catppuccin_mocha')
+    assert controller.item_count == before[0]
+    # Colormaps no theme uses are kept for a while, then deleted
+    assert controller.backend.item_count <= before[1] + controller.backend.colormap_store.keep
+
+
+def test_release_deletes_every_item():
+    controller = Controller(backend=RecordingBackend())
+    for name in THEMES:
+        controller.load(name)
+    controller.release()
+    assert counts(controller) == (0, 0)
+
+
+def test_rebind_forgets_deleted_targets():
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('catppuccin_mocha')
+    controller.bind('kept').bind('deleted')
+    controller.bind_colormap(0, 'kept_plot')
+    controller.bind_colormap(0, 'deleted_plot')
+    backend.delete_item('deleted')
+    backend.delete_item('deleted_plot')
+    controller.load('catppuccin_latte').rebind().rebind_colormaps()
+    assert controller.theme_bindings == ['kept']
+    assert list(controller.colormap_bindings) == ['kept_plot']
+    assert backend.item_themes == {'kept': controller.dpg_theme}
+
+
+def test_unbind():
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('dark').bind().bind('window')
+    controller.unbind('window').unbind()
+    assert controller.theme_bindings == []
+    assert backend.bound_theme == 0
+    assert 'window' not in backend.item_themes
+    controller.load('light').rebind()
+    assert backend.bound_theme == 0
@@ -0,0 +1,112 @@
+from dpgtheminator import history
+from dpgtheminator.history import EditHistory
+from dpgtheminator.models import Color
+from dpgtheminator.patch import Patch
+from dpgtheminator.patch import SlotChange
+
+import pytest
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(history.time, 'monotonic', clock)
+    return clock
+
+
+def grey(value: float) -> Color:
+    return Color(value, value, value)
+
+
+def drag(edits: EditHistory, clock: Clock, field: str, values: list[float], step: float = 0.1):
+    for old, new in zip(values, values[1:]):
+        edits.record(0, 'core_colors', field, grey(old), grey(new))
+        clock.now += step
+
+
+def test_drag_merges_into_one_entry(clock):
+    edits = EditHistory(merge_window=0.5)
+    drag(edits, clock, 'text', [0.0, 0.1, 0.2, 0.3, 0.4])
+    assert len(edits.undo_entries) == 1
+    undo = edits.undo()
+    assert undo == Patch([SlotChange(0, 'core_colors', 'text', grey(0.4), grey(0.0))])
+    assert not edits.can_undo
+    assert edits.redo() == undo.inverted()
+
+
+def test_pause_starts_new_entry(clock):
+    edits = EditHistory(merge_window=0.5)
+    drag(edits, clock, 'text', [0.0, 0.1, 0.2])
+    clock.now += 1.0
+    drag(edits, clock, 'text', [0.2, 0.3])
+    assert len(edits.undo_entries) == 2
+
+
+def test_other_slot_starts_new_entry(clock):
+    edits = EditHistory(merge_window=0.5)
+    drag(edits, clock, 'text', [0.0, 0.1])
+    drag(edits, clock, 'border', [0.0, 0.1])
+    assert len(edits.undo_entries) == 2
+
+
+def test_seal_ends_drag(clock):
+    edits = EditHistory(merge_window=0.5)
+    drag(edits, clock, 'text', [0.0, 0.1])
+    edits.seal()
+    drag(edits, clock, 'text', [0.1, 0.2])
+    assert len(edits.undo_entries) == 2
+
+
+def test_undo_ends_drag(clock):
+    edits = EditHistory(merge_window=0.5)
+    drag(edits, clock, 'text', [0.0, 0.1])
+    drag(edits, clock, 'border', [0.0, 0.1])
+    edits.undo()
+    drag(edits, clock, 'text', [0.1, 0.2])
+    assert len(edits.undo_entries) == 2
+    assert not edits.can_redo
+
+
+def test_merge_updates_size(clock):
+    edits = EditHistory(merge_window=0.5)
+    drag(edits, clock, 'text', [0.0, 0.1, 0.25])
+    assert edits.size == sum(size for _, size in edits.undo_entries)
+    assert edits.size == history._size(edits.undo_entries[0][0])
+
+
+def test_trim_drops_oldest(clock):
+    edits = EditHistory(max_bytes=1000, merge_window=0.5)
+    for index in range(50):
+        edits.push(Patch([SlotChange(0, 'core_colors', 'text', grey(index / 50), grey((index + 1) / 50))]))
+    assert edits.size <= edits.max_bytes
+    assert edits.size == sum(size for _, size in edits.undo_entries)
+    assert 1 < len(edits.undo_entries) < 50
+    assert edits.undo_entries[-1][0].slots[0].new == grey(1.0)
+
+
+def test_trim_keeps_newest_entry(clock):
+    edits = EditHistory(max_bytes=10)
+    edits.push(Patch([SlotChange(0, 'core_colors', 'text', grey(0.0), grey(0.1))]))
+    edits.push(Patch([SlotChange(0, 'core_colors', 'text', grey(0.1), grey(0.2))]))
+    assert len(edits.undo_entries) == 1
+    assert edits.size > edits.max_bytes
+
+
+def test_new_edit_clears_redo(clock):
+    edits = EditHistory(merge_window=0.5)
+    drag(edits, clock, 'text', [0.0, 0.1])
+    edits.seal()
+    drag(edits, clock, 'border', [0.0, 0.1])
+    edits.undo()
+    assert edits.can_redo
+    edits.push(Patch([SlotChange(0, 'core_colors', 'button', None, grey(0.5))]))
+    assert not edits.can_redo
+    assert edits.size == sum(size for _, size in edits.undo_entries)
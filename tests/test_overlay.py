@@ -0,0 +1,111 @@
+import msgspec
+
+from dpgtheminator import exceptions
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.controller import Controller
+from dpgtheminator.models import Color
+from dpgtheminator.models import CoreColors
+from dpgtheminator.models import PlotColors
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+from dpgtheminator.overlay import make_overlay
+from dpgtheminator.overlay import merge
+from dpgtheminator.overlay import resolve
+from dpgtheminator.util import copy_theme
+
+import pytest
+
+
+BUTTON = 5
+RED = Color(1.0, 0.0, 0.0)
+BLUE = Color(0.0, 0.0, 1.0)
+
+
+@pytest.fixture
+def dark() -> Theme:
+    return copy_theme(Controller(backend=RecordingBackend()).load('dark').theme)
+
+
+def edited(theme: Theme) -> Theme:
+    theme = copy_theme(theme)
+    theme.components[0].core_colors.text = RED
+    theme.components[0].core_colors.button = BLUE
+    return theme
+
+
+def test_make_overlay_keeps_only_differences(dark):
+    overlay = make_overlay(dark, edited(dark), 'dark')
+    assert overlay == Theme([ThemeComponent(core_colors=CoreColors(text=RED, button=BLUE))], base='dark')
+    assert merge(dark, overlay) == edited(dark)
+
+
+def test_make_overlay_of_equal_themes_is_empty(dark):
+    assert make_overlay(dark, copy_theme(dark), 'dark') == Theme(base='dark')
+
+
+def test_overlay_adds_components_by_type(dark):
+    theme = copy_theme(dark)
+    theme.components.append(ThemeComponent(core_colors=CoreColors(button=RED), component=BUTTON))
+    overlay = make_overlay(dark, theme, 'dark')
+    assert overlay.components == [theme.components[1]]
+    # Matched by type, not position
+    overlay.components.insert(0, ThemeComponent(plot_colors=PlotColors(line=BLUE)))
+    merged = merge(dark, overlay)
+    assert merged.components[0].plot_colors.line == BLUE
+    assert merged.components[1] == theme.components[1]
+
+
+def test_overlay_colormaps(dark):
+    theme = copy_theme(dark)
+    theme.colormaps = [(RED, BLUE)]
+    overlay = make_overlay(dark, theme, 'dark')
+    assert overlay.colormaps == [(RED, BLUE)]
+    assert merge(dark, overlay).colormaps == [(RED, BLUE)]
+
+
+def test_resolve_chain(dark):
+    themes = {
+        'dark': dark,
+        'reds': Theme([ThemeComponent(core_colors=CoreColors(text=RED, border=RED))], base='dark'),
+        'blue_border': Theme([ThemeComponent(core_colors=CoreColors(border=BLUE))], base='reds'),
+    }
+    resolved = resolve(themes['blue_border'], themes.__getitem__)
+    assert resolved.base is None
+    assert resolved.components[0].core_colors.text == RED
+    assert resolved.components[0].core_colors.border == BLUE
+    assert resolved.components[0].core_colors.window_bg == dark.components[0].core_colors.window_bg
+    # The chain's themes are left as they were
+    assert themes['reds'].components[0].core_colors.border == RED
+
+
+def test_resolve_cycle():
+    themes = {
+        'a': Theme(base='b'),
+        'b': Theme(base='a'),
+    }
+    with pytest.raises(exceptions.ThemeBaseCycle):
+        resolve(themes['a'], themes.__getitem__)
+
+
+def test_overlay_loads_only_its_slots(dark):
+    overlay = make_overlay(dark, edited(dark), 'dark')
+    controller = Controller(backend=RecordingBackend()).load(overlay, 'buttons')
+    assert len(controller.dpg_theme_colors) == 2
+
+
+def test_resolved_overlay_saves_back_sparse(dark, tmp_path):
+    path = tmp_path / 'buttons.json'
+    path.write_bytes(msgspec.json.encode(make_overlay(dark, edited(dark), 'dark')))
+    controller = Controller(backend=RecordingBackend(), resolve_base=True).load(path)
+    assert controller.theme.base == 'dark'
+    assert controller.theme.components[0].core_colors.window_bg == dark.components[0].core_colors.window_bg
+    assert len(controller.dpg_theme_colors) == len(Controller(backend=RecordingBackend()).load(dark, 'dark').dpg_theme_colors)
+
+    controller.update_color(0, 'core_colors', 'border', RED)
+    controller.save()
+    saved = msgspec.json.decode(path.read_bytes(), type=Theme)
+    assert saved == Theme([ThemeComponent(core_colors=CoreColors(border=RED, text=RED, button=BLUE))], base='dark')
+
+    # And it loads back the same
+    reloaded = Controller(backend=RecordingBackend(), resolve_base=True).load(path)
+    assert reloaded.theme == controller.theme
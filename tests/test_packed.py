@@ -0,0 +1,99 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.controller import Controller
+from dpgtheminator.models import COLOR_GROUPS
+from dpgtheminator.models import Color
+from dpgtheminator.models import CoreColors
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+from dpgtheminator.packed import PackedTheme
+from dpgtheminator.packed import to_dpg
+
+
+THEMES = ['dark', 'light', 'light2', 'catppuccin_mocha', 'catppuccin_latte']
+
+
+def load(name: str) -> Theme:
+    return Controller(backend=RecordingBackend()).load(name).theme
+
+
+def sparse() -> Theme:
+    return Theme(
+        [
+            ThemeComponent(core_colors=CoreColors(text=Color(0.1, 0.2, 0.3, 0.4))),
+            ThemeComponent(core_colors=CoreColors(), component=5),
+        ],
+        [(Color(0.9, 0.5, 0.25),)],
+        base='dark',
+    )
+
+
+def set_slots(theme: Theme):
+    '''(component index, group, field, color) for every set slot'''
+    for index, component in enumerate(theme.components):
+        for group in COLOR_GROUPS:
+            colors = getattr(component, group)
+            if colors is None:
+                continue
+            for field in colors.__struct_fields__:
+                color = getattr(colors, field)
+                if color is not None:
+                    yield index, group, field, color
+
+
+@pytest.mark.parametrize('name', THEMES)
+def test_float64_round_trip_is_exact(name):
+    theme = load(name)
+    assert PackedTheme.from_theme(theme, np.float64).to_theme() == theme
+
+
+def test_sparse_round_trip():
+    theme = sparse()
+    packed = PackedTheme.from_theme(theme, np.float64)
+    assert packed.components == [0, 5]
+    assert packed.present['core_colors'].tolist() == [True, True]
+    assert packed.present['plot_colors'].tolist() == [False, False]
+    assert packed.to_theme() == theme
+
+
+@pytest.mark.parametrize('name', THEMES)
+def test_float32_round_trip_to_float32_precision(name):
+    theme = load(name)
+    unpacked = list(set_slots(PackedTheme.from_theme(theme).to_theme()))
+    original = list(set_slots(theme))
+    assert [slot[:3] for slot in unpacked] == [slot[:3] for slot in original]
+    for (*_, color), (*_, expected) in zip(unpacked, original):
+        assert (color.red, color.green, color.blue, color.alpha) == pytest.approx(
+            (expected.red, expected.green, expected.blue, expected.alpha), abs=1e-7
+        )
+
+
+@pytest.mark.parametrize('name', THEMES + ['sparse'])
+def test_iter_dpg_colors_matches_color(name):
+    theme = sparse() if name == 'sparse' else load(name)
+    expected = sorted((index, group, field, color.get_dpg_color()) for index, group, field, color in set_slots(theme))
+    assert sorted(PackedTheme.from_theme(theme).iter_dpg_colors()) == expected
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_to_dpg_rounds_like_color(dtype):
+    # Every exact half step, where rounding half to even matters
+    values = [step / 510 for step in range(511)] + [0.9, 0.1, 1 / 3]
+    array = np.array([(value, value, value, 1.0) for value in values], dtype=dtype)
+    assert to_dpg(array).tolist() == [list(Color(value, value, value).get_dpg_color()) for value in values]
+
+
+def test_to_dpg_unset_is_zero():
+    assert to_dpg(np.full((2, 4), np.nan)).tolist() == [[0, 0, 0, 0]] * 2
+
+
+def test_copy_is_independent():
+    packed = PackedTheme.from_theme(sparse(), np.float64)
+    copied = packed.copy()
+    copied.colors['core_colors'][0] = 0.0
+    copied.colormaps[0][0] = 0.0
+    copied.components[1] = 6
+    assert packed.to_theme() == sparse()
@@ -0,0 +1,125 @@
+import msgspec
+
+from dpgtheminator.compiled import theme_key
+from dpgtheminator.controller import Controller
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.models import Color
+from dpgtheminator.models import CoreColors
+from dpgtheminator.models import PlotColors
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+from dpgtheminator.patch import Patch
+from dpgtheminator.patch import apply_patch
+from dpgtheminator.patch import diff
+from dpgtheminator.util import copy_theme
+
+import pytest
+
+
+BUTTON = 5
+
+
+def red(alpha: float = 1.0) -> Color:
+    return Color(1.0, 0.0, 0.0, alpha)
+
+
+def blue() -> Color:
+    return Color(0.0, 0.0, 1.0)
+
+
+def loaded(name: str) -> Theme:
+    return copy_theme(Controller(backend=RecordingBackend()).load(name).theme)
+
+
+PAIRS = {
+    'slots': lambda: (
+        Theme([ThemeComponent(core_colors=CoreColors(text=red(), border=blue()))]),
+        Theme([ThemeComponent(core_colors=CoreColors(text=blue(), border=blue()))]),
+    ),
+    'group_added': lambda: (
+        Theme([ThemeComponent(core_colors=CoreColors(text=red()))]),
+        Theme([ThemeComponent(core_colors=CoreColors(text=red()), plot_colors=PlotColors(line=blue()))]),
+    ),
+    'group_removed': lambda: (
+        Theme([ThemeComponent(core_colors=CoreColors(text=red()), plot_colors=PlotColors(line=blue()))]),
+        Theme([ThemeComponent(core_colors=CoreColors(text=red()))]),
+    ),
+    'component_added': lambda: (
+        Theme([ThemeComponent(core_colors=CoreColors(text=red()))]),
+        Theme([
+            ThemeComponent(core_colors=CoreColors(text=red())),
+            ThemeComponent(core_colors=CoreColors(button=blue()), component=BUTTON),
+        ]),
+    ),
+    'components_removed': lambda: (
+        Theme([
+            ThemeComponent(core_colors=CoreColors(text=red())),
+            ThemeComponent(core_colors=CoreColors(button=blue()), component=BUTTON),
+            ThemeComponent(plot_colors=PlotColors(line=red()), component=BUTTON + 1),
+        ]),
+        Theme([ThemeComponent(core_colors=CoreColors(text=red()))]),
+    ),
+    'component_retyped': lambda: (
+        Theme([ThemeComponent(core_colors=CoreColors(button=blue()), component=BUTTON)]),
+        Theme([ThemeComponent(core_colors=CoreColors(button=red(0.5)), component=BUTTON + 1)]),
+    ),
+    'colormaps': lambda: (
+        Theme([ThemeComponent()], colormaps=[(red(), blue()), (blue(),)]),
+        Theme([ThemeComponent()], colormaps=[(blue(), red())]),
+    ),
+    'defaults': lambda: (loaded('dark'), loaded('catppuccin_mocha')),
+}
+
+
+@pytest.mark.parametrize('name', PAIRS)
+def test_apply_diff_round_trip(name):
+    old, new = PAIRS[name]()
+    patch = diff(old, new)
+    assert patch
+    assert apply_patch(copy_theme(old), patch) == new
+    assert theme_key(apply_patch(copy_theme(old), patch)) == theme_key(new)
+
+
+@pytest.mark.parametrize('name', PAIRS)
+def test_inverted_round_trip(name):
+    old, new = PAIRS[name]()
+    patch = diff(old, new)
+    assert apply_patch(copy_theme(new), patch.inverted()) == old
+    assert patch.inverted().inverted() == patch
+
+
+@pytest.mark.parametrize('name', PAIRS)
+def test_encoded_round_trip(name):
+    old, new = PAIRS[name]()
+    patch = diff(old, new)
+    decoded = msgspec.json.decode(msgspec.json.encode(patch), type=Patch)
+    assert decoded == patch
+    assert apply_patch(copy_theme(old), decoded) == new
+
+
+def test_structural():
+    assert diff(*PAIRS['component_added']()).structural
+    assert diff(*PAIRS['component_retyped']()).structural
+    assert not diff(*PAIRS['slots']()).structural
+    assert not diff(*PAIRS['group_removed']()).structural
+
+
+def test_removed_group_is_none():
+    old, new = PAIRS['group_removed']()
+    assert apply_patch(old, diff(old, new)).components[0].plot_colors is None
+
+
+def test_equal_themes_have_empty_patch():
+    theme = loaded('dark')
+    assert not diff(theme, copy_theme(theme))
+
+
+@pytest.mark.parametrize('name', ['slots', 'group_removed', 'component_added', 'colormaps', 'defaults'])
+def test_apply_to_controller(name):
+    old, new = PAIRS[name]()
+    controller = Controller(backend=RecordingBackend()).load(copy_theme(old), 'old')
+    controller.apply_patch(diff(old, new))
+    assert controller.theme == new
+    # Structural patches rebuild, caching the old theme, so compare only the live one
+    fresh = Controller(backend=RecordingBackend()).load(copy_theme(new), 'new')
+    assert controller.compiled.item_count == fresh.compiled.item_count
@@ -0,0 +1,121 @@
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.models import Color
+from dpgtheminator.models import CoreColors
+from dpgtheminator.models import ThemeComponent
+from dpgtheminator.pool import ThemePool
+
+
+def variant(red: float) -> ThemeComponent:
+    return ThemeComponent(core_colors=CoreColors(button=Color(red, 0.2, 0.2)))
+
+
+def test_equal_themes_share_one_dpg_theme():
+    backend = RecordingBackend()
+    pool = ThemePool(backend=backend)
+    first = pool.bind_many(range(100), variant(0.8))
+    second = pool.bind_many(range(100, 200), variant(0.8))
+    assert first == second
+    assert len(pool) == 1
+    assert pool.refcounts[pool.bindings[0]] == 200
+    assert backend.item_count == pool.item_count == 3
+    assert all(backend.item_themes[item] == first for item in range(200))
+
+
+def test_rebinding_moves_references():
+    pool = ThemePool(backend=RecordingBackend())
+    error = pool.bind_many(range(10), variant(0.8))
+    warning = pool.bind_many(range(5), variant(0.5))
+    assert error != warning
+    assert sorted(pool.refcounts.values()) == [5, 5]
+    # Binding the same theme again is not another reference
+    pool.bind_many(range(5), variant(0.5))
+    assert sorted(pool.refcounts.values()) == [5, 5]
+    pool.bind_many(range(5, 10), variant(0.5))
+    assert len(pool) == 1
+    assert list(pool.refcounts.values()) == [10]
+
+
+def test_unbind_releases_unused_themes():
+    backend = RecordingBackend()
+    pool = ThemePool(backend=backend)
+    pool.bind_many(range(10), variant(0.8))
+    pool.bind_many(range(10, 20), variant(0.5))
+    pool.unbind_many(range(10))
+    assert len(pool) == 1
+    assert not any(item in backend.item_themes for item in range(10))
+    assert 0 not in pool.bindings
+    # Kept around in case it comes back, without building new items
+    created = backend.created_count
+    pool.bind_many(range(10), variant(0.8))
+    assert backend.created_count == created
+    assert len(pool) == 2
+
+
+def test_unbind_ignores_unknown_and_repeated_targets():
+    pool = ThemePool(backend=RecordingBackend())
+    pool.bind_many(range(3), variant(0.8))
+    pool.unbind_many([0, 0, 'unknown'])
+    assert list(pool.refcounts.values()) == [2]
+    pool.unbind_many([1, 2])
+    assert len(pool) == 0
+    assert not pool.refcounts
+
+
+def test_bind_nothing_keeps_nothing():
+    pool = ThemePool(backend=RecordingBackend())
+    pool.bind_many([], variant(0.8))
+    assert len(pool) == 0
+    assert not pool.refcounts
+
+
+def test_release_deletes_every_item():
+    backend = RecordingBackend()
+    pool = ThemePool(backend=backend)
+    pool.bind_many(range(10), variant(0.8))
+    pool.bind_many(range(10, 20), variant(0.5))
+    pool.unbind_many(range(10, 20))
+    pool.release()
+    assert backend.item_count == pool.item_count == 0
+    assert not pool.bindings
+
+
+def test_prune_forgets_deleted_items():
+    backend = RecordingBackend()
+    pool = ThemePool(backend=backend)
+    pool.bind_many(['a', 'b', 'c'], variant(0.8))
+    pool.bind_many(['d'], variant(0.5))
+    for item in ['a', 'b', 'd']:
+        backend.delete_item(item)
+    pool.prune()
+    assert list(pool.bindings) == ['c']
+    assert list(pool.refcounts.values()) == [1]
+    assert len(pool) == 1
+
+
+def test_rebuilt_tables_dont_pile_up_bindings():
+    backend = RecordingBackend()
+    pool = ThemePool(backend=backend)
+    for rebuild in range(5):
+        rows = [f'row-{rebuild}-{index}' for index in range(1000)]
+        pool.bind_many(rows, variant(rebuild / 10))
+        for row in rows:
+            backend.delete_item(row)
+    pool.bind_many(['last'], variant(0.9))
+    # Pruned along the way, so at most the last two tables' rows are left
+    assert len(pool.bindings) <= 2001
+    pool.prune()
+    assert list(pool.bindings) == ['last']
+    assert len(pool) == 1
+    # Released themes stay cached for a while, but nothing is bound to them
+    assert sum(pool.refcounts.values()) == 1
+
+
+def test_bind_many_prunes_as_bindings_grow():
+    backend = RecordingBackend()
+    pool = ThemePool(backend=backend, min_prune_size=100)
+    for rebuild in range(20):
+        rows = [f'row-{rebuild}-{index}' for index in range(60)]
+        pool.bind_many(rows, variant(0.8))
+        for row in rows:
+            backend.delete_item(row)
+    assert len(pool.bindings) < 2 * 100
@@ -0,0 +1,65 @@
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.controller import Controller
+from dpgtheminator.models import Color
+
+
+RED = Color(1.0, 0.0, 0.0)
+BLUE = Color(0.0, 0.0, 1.0)
+
+
+def text_item_value(controller: Controller):
+    return controller.backend.items[controller.dpg_theme_colors[(0, 'core_colors', 'text')]].value
+
+
+def test_queued_colors_flush_on_next_frame():
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('dark').bind()
+    set_values = backend.calls['set_value']
+    for _ in range(10):
+        controller.queue_color(0, 'core_colors', 'text', RED)
+    controller.queue_color(0, 'core_colors', 'text', BLUE)
+    assert controller.theme.components[0].core_colors.text != BLUE
+    backend.render_frame()
+    assert text_item_value(controller) == BLUE.get_dpg_color()
+    assert backend.calls['set_value'] == set_values + 1
+    assert controller.flush_frame is None
+
+
+def test_missed_frame_is_scheduled_again():
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('dark').bind()
+    controller.queue_color(0, 'core_colors', 'text', RED)
+    # The frame was dispatched before the callback was registered, so it never runs
+    backend.frame_callbacks.clear()
+    backend.frame_count += 1
+    backend.render_frame()
+    assert text_item_value(controller) != RED.get_dpg_color()
+
+    controller.queue_color(0, 'core_colors', 'border', BLUE)
+    backend.render_frame()
+    assert text_item_value(controller) == RED.get_dpg_color()
+    assert controller.theme.components[0].core_colors.border == BLUE
+    assert controller.flush_frame is None
+
+
+def test_queue_load_then_colors():
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('dark').bind()
+    light = Controller(backend=RecordingBackend()).load('light').theme
+    controller.queue_color(0, 'core_colors', 'border', BLUE)
+    controller.queue_load(light, 'light')
+    controller.queue_color(0, 'core_colors', 'text', RED)
+    backend.render_frame()
+    assert controller.name == 'light'
+    assert controller.theme.components[0].core_colors.text == RED
+    assert controller.theme.components[0].core_colors.border == light.components[0].core_colors.border
+    assert backend.bound_theme == controller.dpg_theme
+
+
+def test_without_flush_on_frame_nothing_is_scheduled():
+    backend = RecordingBackend()
+    controller = Controller(backend=backend, flush_on_frame=False).load('dark')
+    controller.queue_color(0, 'core_colors', 'text', RED)
+    assert not backend.frame_callbacks
+    controller.flush()
+    assert text_item_value(controller) == RED.get_dpg_color()
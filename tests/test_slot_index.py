@@ -0,0 +1,58 @@
+import pytest
+
+pytest.importorskip('dearpygui')
+
+from dpgtheminator.gui.theminator import SlotIndex
+from dpgtheminator.gui.theminator import _normalize
+from dpgtheminator.gui.theminator import _slot_search_text
+
+
+def brute_force(query: str) -> frozenset[tuple[str, str]]:
+    query = _normalize(query)
+    return frozenset(key for key, text in _slot_search_text().items() if query in text)
+
+
+def test_empty_query_matches_everything():
+    index = SlotIndex()
+    assert index.match('') == frozenset(_slot_search_text())
+
+
+def test_matches_field_or_constant_name():
+    index = SlotIndex()
+    assert ('core_colors', 'scrollbar_grab') in index.match('Scrollbar Grab')
+    assert index.match('mvPlotCol_Line') == {('plot_colors', 'line')}
+    assert index.match('no such slot') == frozenset()
+
+
+@pytest.mark.parametrize('queries', [
+    ['s', 'sc', 'scr', 'scro', 'scrol'],
+    ['scrol', 'scro', 'scr', 'sc', 's', ''],
+    ['button', 'buttonh', 'butt', 'buttonactive'],
+    ['plot', 'text', 'mvthemecol', 'mvplotcol_', 'bg'],
+])
+def test_each_keystroke_matches_brute_force(queries):
+    index = SlotIndex()
+    for query in queries:
+        assert index.match(query) == brute_force(query), query
+
+
+def test_keeps_only_the_current_prefix_chain():
+    index = SlotIndex()
+    index.match('buttonactive')
+    assert len(index.chain) == len('buttonactive') + 1
+    kept = index.chain[:len('butt') + 1]
+    index.match('butthover')
+    # The shared prefix is reused, the rest replaced
+    assert index.chain[:len('butt') + 1] == kept
+    assert all(new is old for new, old in zip(index.chain, kept))
+    assert len(index.chain) == len('butthover') + 1
+    index.match('b')
+    assert len(index.chain) == 2
+
+
+def test_chain_entries_are_the_prefix_matches():
+    index = SlotIndex()
+    index.match('windowbg')
+    query = index.query
+    for length, found in enumerate(index.chain):
+        assert found == brute_force(query[:length])
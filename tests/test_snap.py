@@ -0,0 +1,98 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from dpgtheminator import colorspace
+from dpgtheminator import snap
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.controller import Controller
+from dpgtheminator.models import COLOR_GROUPS
+from dpgtheminator.models import Color
+from dpgtheminator.models import Palette
+from dpgtheminator.transforms import apply
+
+
+def palette(count: int = 12) -> Palette:
+    rng = np.random.default_rng(0)
+    colors = [Color(*map(float, rgb)) for rgb in rng.random((count, 3))]
+    return Palette(colors, [f'color{index}' for index in range(count)])
+
+
+def theme_colors(theme) -> list[Color]:
+    colors = []
+    for component in theme.components:
+        for group in COLOR_GROUPS:
+            values = getattr(component, group)
+            if values is not None:
+                colors.extend(getattr(values, field) for field in values.__struct_fields__)
+    for colormap in theme.colormaps:
+        colors.extend(colormap)
+    return [color for color in colors if color is not None]
+
+
+@pytest.fixture
+def theme():
+    return Controller(backend=RecordingBackend()).load('catppuccin_mocha').theme
+
+
+@pytest.mark.parametrize('metric', ['oklab', 'ciede2000'])
+def test_nearest_indices_matches_brute_force(metric):
+    rng = np.random.default_rng(1)
+    colors = rng.random((200, 3))
+    candidates = rng.random((40, 3))
+    if metric == 'oklab':
+        lab, candidate_lab = colorspace.srgb_to_oklab(colors), colorspace.srgb_to_oklab(candidates)
+        expected = [np.argmin(np.sum((candidate_lab - color) ** 2, axis=-1)) for color in lab]
+    else:
+        lab, candidate_lab = colorspace.srgb_to_lab(colors), colorspace.srgb_to_lab(candidates)
+        expected = [np.argmin(colorspace.ciede2000(color[None, :], candidate_lab)) for color in lab]
+    assert snap.nearest_indices(colors, candidates, metric).tolist() == [int(index) for index in expected]
+
+
+@pytest.mark.parametrize('metric', ['oklab', 'ciede2000'])
+def test_palette_colors_snap_to_themselves(metric):
+    colors = np.array([(color.red, color.green, color.blue) for color in palette().colors])
+    assert snap.nearest_indices(colors, colors, metric).tolist() == list(range(len(colors)))
+
+
+def test_chunks_give_the_same_result(monkeypatch):
+    rng = np.random.default_rng(2)
+    colors = rng.random((1000, 3))
+    candidates = rng.random((30, 3))
+    whole = snap.nearest_indices(colors, candidates)
+    monkeypatch.setattr(snap, 'CHUNK_SIZE', 7)
+    assert snap.nearest_indices(colors, candidates).tolist() == whole.tolist()
+
+
+@pytest.mark.parametrize('metric', ['oklab', 'ciede2000'])
+def test_snap_to_palette(theme, metric):
+    house = palette()
+    rgb = {(color.red, color.green, color.blue) for color in house.colors}
+    snapped = snap.snap_to_palette(theme, house, metric)
+    originals = theme_colors(theme)
+    colors = theme_colors(snapped)
+    assert len(colors) == len(originals)
+    for original, color in zip(originals, colors):
+        assert (color.red, color.green, color.blue) in rgb
+        assert color.alpha == original.alpha
+
+
+def test_snap_without_keeping_alpha(theme):
+    house = Palette([Color(0.0, 0.0, 0.0, 0.5), Color(1.0, 1.0, 1.0, 0.25)], ['black', 'white'])
+    colors = theme_colors(snap.snap_to_palette(theme, house, keep_alpha=False))
+    assert all(color in house.colors for color in colors)
+
+
+def test_snap_many_themes(theme):
+    house = palette()
+    light = Controller(backend=RecordingBackend()).load('catppuccin_latte').theme
+    snapped = snap.snap_to_palette([theme, light], house)
+    assert snapped == [snap.snap_to_palette(theme, house), snap.snap_to_palette(light, house)]
+    assert snapped[0] == apply(theme, snap.snap(house))
+
+
+def test_invalid_arguments(theme):
+    with pytest.raises(ValueError):
+        snap.snap(Palette([], []))
+    with pytest.raises(ValueError):
+        snap.nearest_indices(np.zeros((1, 3)), np.zeros((1, 3)), 'cie76')
@@ -0,0 +1,122 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from dpgtheminator import transforms
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.controller import Controller
+from dpgtheminator.models import COLOR_GROUPS
+from dpgtheminator.models import Color
+from dpgtheminator.models import CoreColors
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+
+
+def load(name: str) -> Theme:
+    return Controller(backend=RecordingBackend()).load(name).theme
+
+
+def colors(theme: Theme) -> list[Color | None]:
+    '''Every slot, unset ones as None, then every colormap color'''
+    result: list[Color | None] = []
+    for component in theme.components:
+        for group, colors_type in COLOR_GROUPS.items():
+            values = getattr(component, group)
+            result.extend(None if values is None else getattr(values, field) for field in colors_type.__struct_fields__)
+    for colormap in theme.colormaps:
+        result.extend(colormap)
+    return result
+
+
+def as_array(theme: Theme) -> np.ndarray:
+    nan = float('nan')
+    return np.array([
+        (nan,) * 4 if color is None else (color.red, color.green, color.blue, color.alpha)
+        for color in colors(theme)
+    ])
+
+
+@pytest.fixture
+def theme() -> Theme:
+    return load('catppuccin_mocha')
+
+
+def test_no_operations_is_identity(theme):
+    assert transforms.apply(theme) == theme
+
+
+@pytest.mark.parametrize('operation', [
+    transforms.brightness(1.0),
+    transforms.lightness(0.0),
+    transforms.contrast(1.0),
+    transforms.hue_rotate(0.0),
+    transforms.hue_rotate(360.0),
+    transforms.saturation(1.0),
+    transforms.desaturate(0.0),
+    transforms.alpha(1.0),
+])
+def test_neutral_operations_keep_colors(theme, operation):
+    # OKLab round trips are exact only to the precision of its published matrices
+    np.testing.assert_allclose(as_array(transforms.apply(theme, operation)), as_array(theme), atol=1e-6)
+
+
+def test_unset_slots_stay_unset():
+    theme = Theme([ThemeComponent(core_colors=CoreColors(text=Color(0.2, 0.4, 0.6)))])
+    result = transforms.apply(theme, transforms.hue_rotate(90), transforms.brightness(1.5))
+    assert result.components[0].plot_colors is None
+    assert result.components[0].core_colors.text != theme.components[0].core_colors.text
+    assert [color is None for color in colors(result)] == [color is None for color in colors(theme)]
+
+
+def test_desaturate_gives_greys(theme):
+    result = as_array(transforms.apply(theme, transforms.desaturate()))
+    result = result[~np.isnan(result[:, 0])]
+    np.testing.assert_allclose(result[:, 0], result[:, 1], atol=1e-6)
+    np.testing.assert_allclose(result[:, 1], result[:, 2], atol=1e-6)
+
+
+def test_alpha_scales_only_alpha(theme):
+    before = as_array(theme)
+    after = as_array(transforms.apply(theme, transforms.alpha(0.5)))
+    np.testing.assert_allclose(after[:, :3], before[:, :3])
+    np.testing.assert_allclose(after[:, 3], before[:, 3] * 0.5)
+
+
+def test_operations_run_in_order(theme):
+    twice = transforms.apply(theme, transforms.alpha(0.5), transforms.alpha(0.5))
+    np.testing.assert_allclose(as_array(twice)[:, 3], as_array(theme)[:, 3] * 0.25)
+
+
+def test_results_are_clipped(theme):
+    result = as_array(transforms.apply(theme, transforms.brightness(10.0), transforms.contrast(3.0)))
+    result = result[~np.isnan(result[:, 0])]
+    assert result.min() >= 0.0 and result.max() <= 1.0
+
+
+def test_lightness_moves_towards_white_and_black(theme):
+    lighter = as_array(transforms.apply(theme, transforms.lightness(0.1)))
+    darker = as_array(transforms.apply(theme, transforms.lightness(-0.1)))
+    original = as_array(theme)
+    set_rows = ~np.isnan(original[:, 0])
+    luminance = lambda array: array[set_rows, :3].sum(axis=1)
+    assert np.all(luminance(lighter) >= luminance(original) - 1e-9)
+    assert np.all(luminance(darker) <= luminance(original) + 1e-9)
+
+
+def test_colormaps_can_be_left_alone(theme):
+    assert theme.colormaps
+    result = transforms.apply(theme, transforms.hue_rotate(120), colormaps=False)
+    assert result.colormaps == theme.colormaps
+    assert transforms.apply(theme, transforms.hue_rotate(120)).colormaps != theme.colormaps
+
+
+def test_many_themes_match_one_at_a_time():
+    themes = [load(name) for name in ['dark', 'light', 'catppuccin_mocha']]
+    operations = (transforms.hue_rotate(45), transforms.desaturate(0.3))
+    assert transforms.apply(themes, *operations) == [transforms.apply(theme, *operations) for theme in themes]
+
+
+def test_loads_into_a_controller(theme):
+    disabled = transforms.apply(theme, transforms.desaturate(0.8), transforms.alpha(0.6))
+    controller = Controller(backend=RecordingBackend()).load(disabled, 'disabled')
+    assert controller.theme == disabled
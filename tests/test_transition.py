@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.controller import Controller
+
+
+def assert_items_match_theme(controller: Controller):
+    '''Every live ThemeColor item holds its slot's color from the controller's Theme'''
+    backend = controller.backend
+    for (component, group, field), item in controller.compiled.colors.items():
+        color = getattr(getattr(controller.theme.components[component], group), field)
+        assert backend.items[item].value == color.get_dpg_color(), (group, field)
+
+
+def test_transition_reaches_target():
+    controller = Controller(backend=RecordingBackend()).load('light').bind()
+    target = Controller(backend=RecordingBackend()).load('dark').theme
+    compiled = controller.compiled
+    controller.transition_to('dark', duration=0.1, fps=60)
+    for frame in range(controller.transition.steps):
+        controller.transition.advance(frame)
+    assert controller.transition is None
+    assert controller.compiled is compiled
+    assert controller.name == 'dark'
+    assert controller.theme == target
+    assert_items_match_theme(controller)
+
+
+def test_transition_runs_on_frames():
+    backend = RecordingBackend()
+    controller = Controller(backend=backend).load('light').bind()
+    controller.transition_to('dark', duration=0)
+    backend.render_frame()
+    assert controller.transition is None
+    assert controller.name == 'dark'
+    assert_items_match_theme(controller)
+
+
+def test_cancelled_transition_leaves_cache_intact():
+    controller = Controller(backend=RecordingBackend()).load('light').bind()
+    controller.transition_to('dark', duration=0.3)
+    for frame in range(5):
+        controller.transition.advance(frame)
+    # Loading cancels the crossfade and caches the half faded items
+    controller.load('catppuccin_mocha')
+    assert controller.transition is None
+    controller.load('light')
+    assert controller.name == 'light'
+    assert_items_match_theme(controller)
+
+
+def test_transition_then_load_from_cache():
+    controller = Controller(backend=RecordingBackend()).load('light').bind()
+    controller.transition_to('dark', duration=0.3)
+    controller.transition.advance(3)
+    controller.load('dark')
+    assert_items_match_theme(controller)
+    controller.load('light')
+    assert_items_match_theme(controller)
@@ -0,0 +1,106 @@
+import os
+import pathlib
+
+import msgspec
+
+from dpgtheminator.backends import RecordingBackend
+from dpgtheminator.controller import Controller
+from dpgtheminator.models import Color
+from dpgtheminator.models import CoreColors
+from dpgtheminator.models import Theme
+from dpgtheminator.models import ThemeComponent
+
+import pytest
+
+
+def theme(text: Color) -> Theme:
+    return Theme([ThemeComponent(core_colors=CoreColors(text=text, border=Color(0.5, 0.5, 0.5)))])
+
+
+def write(path: pathlib.Path, content: Theme):
+    path.write_bytes(msgspec.json.encode(content))
+    # Make sure the watcher sees a new stamp however coarse the file system's clock
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def files(tmp_path) -> tuple[pathlib.Path, pathlib.Path]:
+    a = tmp_path / 'a.json'
+    b = tmp_path / 'b.json'
+    write(a, theme(Color(1.0, 0.0, 0.0)))
+    write(b, theme(Color(0.0, 0.0, 1.0)))
+    return a, b
+
+
+@pytest.fixture
+def controller():
+    controller = Controller(backend=RecordingBackend(), flush_on_frame=False)
+    yield controller
+    if controller.watcher is not None:
+        controller.watcher.stop()
+
+
+def text_color(controller: Controller) -> Color:
+    return controller.theme.components[0].core_colors.text
+
+
+def test_edit_is_applied(files, controller):
+    a, _ = files
+    # A long interval, so only the explicit check() calls below poll
+    watcher = controller.load(a).bind().watch(interval=3600)
+    compiled = controller.compiled
+    write(a, theme(Color(0.0, 1.0, 0.0)))
+    assert watcher.check()
+    controller.flush()
+    assert text_color(controller) == Color(0.0, 1.0, 0.0)
+    assert controller.compiled is compiled
+
+
+def test_edits_to_a_file_no_longer_loaded_are_ignored(files, controller):
+    a, b = files
+    watcher = controller.load(a).bind().watch(interval=3600)
+    controller.load(b)
+    assert watcher.path == b
+    write(a, theme(Color(0.0, 1.0, 0.0)))
+    assert not watcher.check()
+    controller.flush()
+    assert text_color(controller) == Color(0.0, 0.0, 1.0)
+    controller.save()
+    assert msgspec.json.decode(b.read_bytes(), type=Theme) == theme(Color(0.0, 0.0, 1.0))
+
+    # The newly loaded file is watched instead
+    write(b, theme(Color(1.0, 1.0, 0.0)))
+    assert watcher.check()
+    controller.flush()
+    assert text_color(controller) == Color(1.0, 1.0, 0.0)
+
+
+def test_unowned_watcher_ignores_other_themes(files, controller):
+    from dpgtheminator.watch import ThemeWatcher
+
+    a, b = files
+    watcher = ThemeWatcher(controller.load(a), a)
+    controller.load(b)
+    write(a, theme(Color(0.0, 1.0, 0.0)))
+    assert not watcher.check()
+    assert not controller.pending_colors
+
+
+def test_loading_a_default_theme_stops_the_watcher(files, controller):
+    a, _ = files
+    watcher = controller.load(a).watch(interval=3600)
+    controller.load('dark')
+    assert controller.watcher is None
+    assert watcher.thread is None
+    write(a, theme(Color(0.0, 1.0, 0.0)))
+    assert not watcher.check()
+
+
+def test_watch_replaces_running_watcher(files, controller):
+    a, _ = files
+    first = controller.load(a).watch(interval=3600)
+    second = controller.watch(interval=3600)
+    assert controller.watcher is second
+    assert first.thread is None
+    assert second.thread is not None